@@ -1,124 +1,434 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-def calculate_demographic_data(print_data=True):
+# Columns used by the analysis and the compact dtypes they are read with
+CATEGORY_COLUMNS = [
+    "race", "sex", "education", "occupation", "native-country", "salary"
+]
+# (int16: hours per week can reach 168, beyond the int8 range)
+INTEGER_COLUMNS = {"age": np.int16, "hours-per-week": np.int16}
+
+
+def load_data(path="adult.data.csv", cache=True):
+    """
+    Load the columns of the census CSV that the analysis needs.
+
+    Text columns are read as categoricals and numbers as small integers.
+    With cache=True the parsed columns are saved next to the CSV in a
+    binary .npz sidecar (category codes plus category labels, and the
+    integer arrays). Later calls load the sidecar instead of parsing the
+    CSV, as long as the CSV's size, modification time and content hash
+    still match the ones recorded in it. A cache that cannot be read or
+    written (corrupt file, read-only directory, full disk) is ignored and
+    the CSV is parsed instead.
+
+    Parameters:
+        path (str): Path to the CSV file.
+        cache (bool): Whether to read and write the sidecar cache.
+
+    Returns:
+        pandas.DataFrame: The needed columns with compact dtypes.
+    """
+    if not cache:
+        return _read_csv(path)
+
+    cache_path = path + ".cache.npz"
+    signature = _file_signature(path)
+    # Caches written with other integer dtypes are rebuilt
+    signature["dtypes"] = {
+        column: np.dtype(dtype).name
+        for column, dtype in INTEGER_COLUMNS.items()
+    }
+
+    # ----------------------------------------------------
+    # Use the sidecar if it was built from this exact file
+    # ----------------------------------------------------
+    try:
+        with np.load(cache_path, allow_pickle=False) as stored:
+            if json.loads(str(stored["signature"])) == signature:
+                return _frame_from_arrays(stored)
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+        pass  # Missing or unreadable cache: parse the CSV
+
+    df = _read_csv(path)
+
+    # ----------------------------------------------------
+    # Save the columns as plain arrays, then swap the file in
+    # ----------------------------------------------------
+    arrays = {"signature": np.array(json.dumps(signature))}
+    for column in CATEGORY_COLUMNS:
+        values = df[column].cat
+        arrays[f"{column}.codes"] = values.codes.to_numpy()
+        arrays[f"{column}.categories"] = \
+            values.categories.to_numpy().astype(str)
+    for column in INTEGER_COLUMNS:
+        arrays[column] = df[column].to_numpy()
+
+    # A unique temporary name keeps concurrent writers apart
+    try:
+        handle, temp_path = tempfile.mkstemp(
+            suffix=".tmp.npz", dir=os.path.dirname(cache_path) or "."
+        )
+        try:
+            with os.fdopen(handle, "wb") as file:
+                np.savez(file, **arrays)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        pass  # Read-only directory or full disk: work without the cache
+
+    return df
+
+
+def _read_csv(path, chunksize=None):
+    """
+    Parse only the needed CSV columns with compact dtypes (as an iterator
+    of DataFrames of chunksize rows when chunksize is given).
+    """
+    dtypes = dict.fromkeys(CATEGORY_COLUMNS, "category")
+    dtypes.update(INTEGER_COLUMNS)
+    return pd.read_csv(
+        path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize
+    )
+
+
+def _file_signature(path):
+    """
+    Return the size, modification time and BLAKE2 hash of a file.
+    """
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": digest.hexdigest(),
+    }
+
+
+def _frame_from_arrays(stored):
+    """
+    Rebuild the DataFrame from the arrays of a sidecar cache.
+    """
+    columns = {}
+    for column in CATEGORY_COLUMNS:
+        columns[column] = pd.Categorical.from_codes(
+            stored[f"{column}.codes"], stored[f"{column}.categories"]
+        )
+    for column in INTEGER_COLUMNS:
+        columns[column] = stored[column]
+    return pd.DataFrame(columns)
+
+
+def calculate_demographic_data(print_data=True, path="adult.data.csv",
+                               chunksize=None):
     """
     Analyze demographic data from the Adult Census dataset.
 
     The function calculates statistics related to race distribution, age,
     education level, working hours, salary, and occupation using pandas.
+    All statistics come from one aggregation pass over integer codes of
+    the categorical columns (see aggregate()).
+
+    With chunksize set, the CSV is streamed instead of loaded: each chunk
+    of rows is reduced to its aggregates and merged into a running total,
+    so memory use depends on the chunk size rather than the file size.
+    The results are exactly the same as for the in-memory path.
 
     Parameters:
         print_data (bool): Whether to print the calculated results to console.
+        path (str): Path to the census CSV file.
+        chunksize (int): Rows per chunk for streaming, or None to load
+            the whole file.
 
     Returns:
         dict: A dictionary containing all computed demographic statistics.
     """
 
-    # Load dataset from CSV file into a pandas DataFrame
-    df = pd.read_csv("adult.data.csv")
+    if chunksize is None:
+        # Load the needed columns (from the binary cache when it is valid)
+        aggregates = aggregate(load_data(path))
+    else:
+        aggregates = aggregate_csv(path, chunksize)
+
+    results = summarize(aggregates)
+    if print_data:
+        print_results(results)
+    return results
+
+
+def calculate_shards(paths, workers=None, chunksize=None, print_data=False):
+    """
+    Analyze census data split across many CSV shards.
+
+    Every shard is reduced to its aggregates in a worker process (see
+    aggregate()), and the partial aggregates are merged into the result
+    that calculate_demographic_data() gives for all rows together.
+
+    Parameters:
+        paths (str or list): A glob pattern or a list of CSV paths.
+        workers (int): Number of worker processes (None: one per CPU,
+            1: run in this process).
+        chunksize (int): Rows per chunk when streaming each shard, or
+            None to read each shard whole.
+        print_data (bool): Whether to print the calculated results.
+
+    Returns:
+        dict: A dictionary containing all computed demographic statistics.
+    """
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(paths))
+    if not paths:
+        raise ValueError("no shard files given")
+
+    if workers == 1:
+        partials = (_shard_aggregates(path, chunksize) for path in paths)
+        aggregates = merge_aggregates(partials)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = pool.map(
+                _shard_aggregates, paths, [chunksize] * len(paths)
+            )
+            aggregates = merge_aggregates(partials)
+
+    results = summarize(aggregates)
+    if print_data:
+        print_results(results)
+    return results
+
+
+def _shard_aggregates(path, chunksize):
+    """
+    Return the aggregates of one shard (runs in a worker process).
+    """
+    if chunksize is None:
+        return aggregate(_read_csv(path))
+    return aggregate_csv(path, chunksize)
+
+
+# ----------------------------------------------------
+# Aggregation engine
+# ----------------------------------------------------
+# Education levels that count as advanced education
+ADVANCED_EDUCATION = "Bachelors|Masters|Doctorate"
+
+
+def aggregate(df):
+    """
+    Reduce a DataFrame to the counts and sums every statistic needs.
+
+    Each categorical column is turned into integer codes once, the
+    per-row conditions (male, advanced education, rich) are looked up
+    from the few category labels, and all counts come from bincount
+    reductions over the codes.
+
+    Parameters:
+        df (pandas.DataFrame): Data with the columns from load_data().
+
+    Returns:
+        dict: Counts and sums; counts by label are pandas Series.
+    """
+    race, race_labels = _codes(df["race"])
+    sex, sex_labels = _codes(df["sex"])
+    education, education_labels = _codes(df["education"])
+    salary, salary_labels = _codes(df["salary"])
+    country, country_labels = _codes(df["native-country"])
+    occupation, occupation_labels = _codes(df["occupation"])
+    age = df["age"].to_numpy(dtype=np.int64)
+    hours = df["hours-per-week"].to_numpy(dtype=np.int64)
+
+    # ----------------------------------------------------
+    # Per-row conditions, evaluated once per label
+    # ----------------------------------------------------
+    male = _label_mask(sex, sex_labels != "Female")
+    bachelors = _label_mask(education, education_labels == "Bachelors")
+    advanced = _label_mask(
+        education, education_labels.str.contains(ADVANCED_EDUCATION)
+    )
+    has_education = education >= 0
+    rich = _label_mask(salary, salary_labels == ">50K")
+    india = _label_mask(country, country_labels == "India")
+
+    # ----------------------------------------------------
+    # Shared reductions
+    # ----------------------------------------------------
+    # Group code: 2 * advanced + rich, for rows with an education
+    education_groups = np.bincount(
+        2 * advanced[has_education] + rich[has_education], minlength=4
+    )
+
+    # An empty chunk has no minimum; merge_aggregates() skips it
+    min_hours = hours.min() if len(hours) else None
+    at_min_hours = hours == min_hours
+
+    return {
+        "race": _label_counts(race, race_labels),
+        "men": np.int64(male.sum()),
+        "men_age_sum": np.int64(age[male].sum()),
+        "education_total": np.int64(has_education.sum()),
+        "bachelors": np.int64(bachelors.sum()),
+        "advanced": np.int64(education_groups[2] + education_groups[3]),
+        "advanced_rich": np.int64(education_groups[3]),
+        "other": np.int64(education_groups[0] + education_groups[1]),
+        "other_rich": np.int64(education_groups[1]),
+        "min_hours": None if min_hours is None else np.int64(min_hours),
+        "min_hours_total": int(at_min_hours.sum()),
+        "min_hours_rich": int((at_min_hours & rich).sum()),
+        "country": _label_counts(country, country_labels),
+        "country_rich": _label_counts(country[rich], country_labels),
+        "india_rich_occupation": _label_counts(
+            occupation[india & rich], occupation_labels
+        ),
+    }
+
+
+def merge_aggregates(partials):
+    """
+    Combine the aggregates of several parts of the data.
+
+    Counts and sums are added (per label for the labelled counts, over
+    the union of the labels). The smaller minimum of the working hours
+    wins, and its counts are added when both parts share it. Partials
+    are consumed one at a time, so a generator keeps only one part in
+    memory.
+
+    Parameters:
+        partials (iterable): Outputs of aggregate().
+
+    Returns:
+        dict: The aggregates of all parts together.
+    """
+    merged = None
+    for partial in partials:
+        if merged is None:
+            merged = dict(partial)
+            continue
+
+        for key, value in partial.items():
+            if isinstance(value, pd.Series):
+                merged[key] = _add_counts(merged[key], value)
+            elif not key.startswith("min_hours"):
+                merged[key] = merged[key] + value
+
+        # ----------------------------------------------------
+        # Keep the lower minimum and the counts that belong to it
+        # ----------------------------------------------------
+        current, other = merged["min_hours"], partial["min_hours"]
+        if other is None:
+            continue
+        if current is None or other < current:
+            for key in ("min_hours", "min_hours_total", "min_hours_rich"):
+                merged[key] = partial[key]
+        elif other == current:
+            merged["min_hours_total"] += partial["min_hours_total"]
+            merged["min_hours_rich"] += partial["min_hours_rich"]
+
+    if merged is None:
+        raise ValueError("no data to aggregate")
+    return merged
+
+
+def aggregate_csv(path, chunksize=100000):
+    """
+    Stream a census CSV in chunks and return the merged aggregates.
+
+    Parameters:
+        path (str): Path to the CSV file.
+        chunksize (int): Number of rows parsed and held at a time.
+
+    Returns:
+        dict: The same aggregates aggregate() gives for the whole file.
+    """
+    with _read_csv(path, chunksize=chunksize) as chunks:
+        return merge_aggregates(aggregate(chunk) for chunk in chunks)
+
+
+def summarize(aggregates):
+    """
+    Compute the ten statistics from the aggregates of aggregate().
+
+    Parameters:
+        aggregates (dict): Output of aggregate() (or of merged partials).
+
+    Returns:
+        dict: The demographic statistics.
+    """
 
     # ----------------------------------------------------
     # Race distribution
     # ----------------------------------------------------
-    # Count the number of people belonging to each race
-    races = df["race"].value_counts()
-    race_count = pd.Series(data=races.values, index=races.index)
+    # Most common race first, labels with no rows left out
+    races = aggregates["race"]
+    races = races[races > 0].sort_values(ascending=False, kind="stable")
+    race_count = pd.Series(
+        data=races.values, index=pd.Index(races.index, name="race")
+    )
 
     # ----------------------------------------------------
     # Average age of men
     # ----------------------------------------------------
-    # Filter dataset to include only male records
-    men_chart = df[df.ne("Female").all(axis=1)]
-    average_age_men = round(men_chart["age"].mean(), 1)
+    average_age_men = round(
+        np.float64(aggregates["men_age_sum"]) / aggregates["men"], 1
+    )
 
     # ----------------------------------------------------
     # Percentage of people with a Bachelor's degree
     # ----------------------------------------------------
-    bachelor_counts = (df["education"] == "Bachelors").sum()
-    education_total = df["education"].count()
-    percentage_bachelors = round((bachelor_counts / education_total) * 100, 1)
+    percentage_bachelors = round(
+        (aggregates["bachelors"] / aggregates["education_total"]) * 100, 1
+    )
 
     # ----------------------------------------------------
     # Income comparison based on education level
     # ----------------------------------------------------
-    # People with advanced education (Bachelors, Masters, Doctorate)
-    advance_education = df.loc[
-        df["education"].str.contains("Bachelors|Masters|Doctorate")
-    ]
-    adv_high_salary = advance_education.loc[
-        advance_education["salary"].str.contains(">50K")
-    ]
-    higher_education_count = adv_high_salary["salary"].count()
-
-    # People without advanced education
-    low_education = df.loc[
-        ~df["education"].str.contains("Bachelors|Masters|Doctorate")
-    ]
-    low_high_salary = low_education.loc[
-        low_education["salary"].str.contains(">50K")
-    ]
-    low_high_salary_count = low_high_salary["salary"].count()
-
-    # Calculate percentage of high earners in each group
-    all_high_salary = advance_education["salary"].count()
-    all_low_salary = low_education["salary"].count()
-    higher_education_rich = round(higher_education_count / all_high_salary * 100, 1)
-    lower_education_rich = round(low_high_salary_count / all_low_salary * 100, 1)
+    higher_education_rich = round(
+        aggregates["advanced_rich"] / aggregates["advanced"] * 100, 1
+    )
+    lower_education_rich = round(
+        aggregates["other_rich"] / aggregates["other"] * 100, 1
+    )
 
     # ----------------------------------------------------
     # Minimum working hours
     # ----------------------------------------------------
-    # Identify the minimum number of working hours per week
-    min_work_hours = df["hours-per-week"].min()
-
-    # Percentage of people earning >50K among those who work minimum hours
-    min_hours_rich = df.loc[
-        (df["hours-per-week"] == 1) & (df["salary"] == ">50K")
-    ]
-    all_min_hours = df.loc[df["hours-per-week"] == 1]
-    num_min_workers_rich = len(min_hours_rich.index)
+    min_work_hours = aggregates["min_hours"]
     rich_percentage = round(
-        (num_min_workers_rich / len(all_min_hours.index)) * 100, 1
+        (aggregates["min_hours_rich"] / aggregates["min_hours_total"]) * 100, 1
     )
 
     # ----------------------------------------------------
     # Country with highest percentage of high earners
     # ----------------------------------------------------
-    all_salary = df.loc[df["salary"] == ">50K"]
-    high_country_count = all_salary["native-country"].value_counts()
-    country_count = df["native-country"].value_counts()
-
-    highest_earning_country = (high_country_count / country_count).idxmax()
-    highest_earning_country_percentage = round(
-        (high_country_count / country_count).max() * 100, 1
+    # Countries in label order, so ties go to the first label
+    country_count = aggregates["country"]
+    country_count = country_count[country_count > 0].sort_index()
+    high_country_count = aggregates["country_rich"].reindex(
+        country_count.index, fill_value=0
     )
+    rich_share = high_country_count / country_count
 
-    # ----------------------------------------------------
-    # Most popular occupation for high earners in India
-    # ----------------------------------------------------
-    high_salary_indians = df.loc[
-        (df["native-country"] == "India") & (df["salary"] == ">50K")
-    ]
-    occupation_count = high_salary_indians["occupation"].value_counts()
-    top_IN_occupation = occupation_count.idxmax()
+    highest_earning_country = str(rich_share.idxmax())
+    highest_earning_country_percentage = round(rich_share.max() * 100, 1)
 
     # ----------------------------------------------------
-    # Output results
+    # Most popular occupation for high earners in India
     # ----------------------------------------------------
-    if print_data:
-        print("Number of each race:\n", race_count)
-        print("Average age of men:", average_age_men)
-        print(f"Percentage with Bachelors degrees: {percentage_bachelors}%")
-        print(f"Percentage with higher education that earn >50K: {higher_education_rich}%")
-        print(f"Percentage without higher education that earn >50K: {lower_education_rich}%")
-        print(f"Min work time: {min_work_hours} hours/week")
-        print(f"Percentage of rich among those who work fewest hours: {rich_percentage}%")
-        print("Country with highest percentage of rich:", highest_earning_country)
-        print(
-            f"Highest percentage of rich people in country: "
-            f"{highest_earning_country_percentage}%"
-        )
-        print("Top occupations in India:", top_IN_occupation)
+    occupation_count = aggregates["india_rich_occupation"].sort_index()
+    top_IN_occupation = str(occupation_count.idxmax())
 
     return {
         "race_count": race_count,
@@ -132,3 +442,152 @@ def calculate_demographic_data(print_data=True):
         "highest_earning_country_percentage": highest_earning_country_percentage,
         "top_IN_occupation": top_IN_occupation,
     }
+
+
+def print_results(results):
+    """
+    Print the statistics returned by calculate_demographic_data().
+    """
+    print("Number of each race:\n", results["race_count"])
+    print("Average age of men:", results["average_age_men"])
+    print(f"Percentage with Bachelors degrees: {results['percentage_bachelors']}%")
+    print(f"Percentage with higher education that earn >50K: {results['higher_education_rich']}%")
+    print(f"Percentage without higher education that earn >50K: {results['lower_education_rich']}%")
+    print(f"Min work time: {results['min_work_hours']} hours/week")
+    print(f"Percentage of rich among those who work fewest hours: {results['rich_percentage']}%")
+    print("Country with highest percentage of rich:", results["highest_earning_country"])
+    print(
+        f"Highest percentage of rich people in country: "
+        f"{results['highest_earning_country_percentage']}%"
+    )
+    print("Top occupations in India:", results["top_IN_occupation"])
+
+
+def _codes(column):
+    """
+    Return a column's integer codes (-1 for missing) and its labels.
+    """
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype("category")
+    categories = column.cat.categories
+    return column.cat.codes.to_numpy(), pd.Series(categories, index=categories)
+
+
+def _label_mask(codes, label_flags):
+    """
+    Spread a per-label condition to the rows (False for missing values).
+    """
+    flags = np.append(label_flags.to_numpy(dtype=bool), False)
+    return flags[codes]  # Code -1 picks the trailing False
+
+
+def _label_counts(codes, labels):
+    """
+    Count the rows per label, as a Series indexed by label.
+    """
+    counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+    return pd.Series(counts, index=labels.index)
+
+
+def _add_counts(left, right):
+    """
+    Add two label-indexed count Series over the union of their labels.
+    """
+    total = left.add(right, fill_value=0).astype(np.int64)
+    return total.sort_index()
+
+
+def benchmark(path="adult.data.csv", repeat=20):
+    """
+    Print the average time of the aggregation pass and of full calls
+    with and without the sidecar cache.
+    """
+    df = load_data(path)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        summarize(aggregate(df))
+    per_pass = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        summarize(aggregate(load_data(path, cache=False)))
+    from_csv = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        calculate_demographic_data(print_data=False, path=path)
+    cached = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        calculate_demographic_data(print_data=False, path=path, chunksize=5000)
+    streamed = (time.perf_counter() - start) / repeat
+
+    print(f"aggregation pass:       {per_pass * 1000:8.2f} ms")
+    print(f"full call (parse CSV):  {from_csv * 1000:8.2f} ms")
+    print(f"full call (cached):     {cached * 1000:8.2f} ms")
+    print(f"full call (streamed):   {streamed * 1000:8.2f} ms")
+
+
+def write_synthetic_shards(directory, shards=8, rows=50000,
+                           path="adult.data.csv", seed=0):
+    """
+    Write CSV shards of rows resampled from the census file.
+
+    Parameters:
+        directory (str): Folder to write shard_000.csv, shard_001.csv, ...
+        shards (int): Number of shard files.
+        rows (int): Rows per shard.
+        path (str): Census CSV whose schema and values are resampled.
+        seed (int): Seed for the row sampling.
+
+    Returns:
+        list: Paths of the written shards.
+    """
+    source = pd.read_csv(path)
+    rng = np.random.default_rng(seed)
+
+    paths = []
+    for number in range(shards):
+        rows_taken = rng.integers(0, len(source), size=rows)
+        shard_path = os.path.join(directory, f"shard_{number:03d}.csv")
+        source.iloc[rows_taken].to_csv(shard_path, index=False)
+        paths.append(shard_path)
+    return paths
+
+
+def benchmark_shards(shards=8, rows=50000, path="adult.data.csv"):
+    """
+    Print the time of calculate_shards() on synthetic shards for 1, 2,
+    4, ... worker processes up to the number of CPUs, with the speedup
+    over one worker.
+    """
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_synthetic_shards(directory, shards, rows, path)
+        expected = calculate_shards(paths, workers=1)
+
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            results = calculate_shards(paths, workers=workers)
+            elapsed = time.perf_counter() - start
+
+            if not results["race_count"].equals(expected["race_count"]):
+                raise RuntimeError(
+                    f"{workers} workers gave different results from one"
+                )
+            baseline = baseline or elapsed
+            print(
+                f"{workers:3d} workers: {elapsed:8.3f} s  "
+                f"speedup {baseline / elapsed:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    benchmark()
+    benchmark_shards()
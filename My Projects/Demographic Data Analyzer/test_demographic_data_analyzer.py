@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+
+from demographic_data_analyzer import (
+    calculate_demographic_data, calculate_shards, load_data
+)
+
+HEADER = (
+    "age,workclass,fnlwgt,education,education-num,marital-status,"
+    "occupation,relationship,race,sex,capital-gain,capital-loss,"
+    "hours-per-week,native-country,salary\n"
+)
+ROWS = [
+    # Values above the int8 range must not wrap around
+    "200,Private,1,Bachelors,13,Never-married,Prof-specialty,"
+    "Not-in-family,White,Male,0,0,168,India,>50K\n",
+    "30,Private,1,HS-grad,9,Never-married,Sales,"
+    "Not-in-family,Black,Female,0,0,150,United-States,<=50K\n",
+    "40,Private,1,Masters,14,Never-married,Sales,"
+    "Not-in-family,White,Male,0,0,150,United-States,>50K\n",
+]
+
+
+class LargeIntegerValues(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "adult.data.csv")
+        with open(self.path, "w") as file:
+            file.write(HEADER + "".join(ROWS))
+
+    def check(self, results):
+        self.assertEqual(results["min_work_hours"], 150)
+        self.assertEqual(results["rich_percentage"], 50.0)
+        self.assertEqual(results["average_age_men"], 120.0)
+
+    def test_loader_keeps_values_above_127(self):
+        for cache in (False, True, True):
+            df = load_data(self.path, cache=cache)
+            self.assertEqual(df["age"].tolist(), [200, 30, 40])
+            self.assertEqual(df["hours-per-week"].tolist(), [168, 150, 150])
+
+    def test_in_memory_streaming_and_shards_agree(self):
+        self.check(calculate_demographic_data(False, self.path))
+        self.check(calculate_demographic_data(False, self.path, chunksize=1))
+        self.check(calculate_shards([self.path], workers=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
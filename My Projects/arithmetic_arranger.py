@@ -1,3 +1,23 @@
+import argparse
+import re
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+
+# Supported operators and their corresponding operations
+OPS = {
+    "+": lambda x, y: x + y,
+    "-": lambda x, y: x - y
+}
+
+# Fast path for well-formed problems, e.g. "32 + 698"
+_VALID_PROBLEM = re.compile(r"\s*([0-9]{1,4})\s+([+-])\s+([0-9]{1,4})\s*")
+
+
 def arithmetic_arranger(problems, show_answer=False):
     """
     Arrange arithmetic problems vertically and side-by-side.
@@ -19,11 +39,128 @@ def arithmetic_arranger(problems, show_answer=False):
     if len(problems) > 5:
         return "Error: Too many problems."
 
-    # Supported operators and their corresponding operations
-    ops = {
-        "+": lambda x, y: x + y,
-        "-": lambda x, y: x - y
-    }
+    # Split each problem into components: operand1, operator, operand2
+    problem = []
+    for p in problems:
+        parsed = _parse_problem(p, strict=False)
+        if isinstance(parsed, str):
+            return parsed
+        problem.append(parsed)
+
+    return _format_problems(problem, show_answer)
+
+
+def arrange_pages(problems, show_answer=False, page_size=5, errors=None):
+    """
+    Lazily arrange any number of problems into pages.
+
+    Problems are read from the iterable one at a time and validated as
+    they arrive; every invalid problem is skipped and reported, so the
+    memory used stays the same however large the input is.
+
+    Parameters:
+        problems (iterable): Arithmetic problem strings.
+        show_answer (bool): Whether to include the calculated answers.
+        page_size (int): Maximum number of problems per page.
+        errors (list, optional): Receives an (index, problem, message)
+            tuple for every invalid problem.
+
+    Yields:
+        str: One formatted page of up to page_size problems.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1.")
+
+    page = []
+    for index, p in enumerate(problems):
+        parsed = _parse_problem(p)
+        if isinstance(parsed, str):
+            if errors is not None:
+                errors.append((index, p, parsed))
+            continue
+
+        page.append(parsed)
+        if len(page) == page_size:
+            yield _format_problems(page, show_answer)
+            page = []
+
+    if page:
+        yield _format_problems(page, show_answer)
+
+
+def validate_problems(problems):
+    """
+    Check every problem in one pass.
+
+    Parameters:
+        problems (iterable): Arithmetic problem strings.
+
+    Yields:
+        tuple: (index, problem, message) for every invalid problem.
+    """
+    for index, p in enumerate(problems):
+        parsed = _parse_problem(p)
+        if isinstance(parsed, str):
+            yield index, p, parsed
+
+
+# ------------------------------------------------
+# Parsing and formatting helpers
+# ------------------------------------------------
+def _parse_problem(p, strict=True):
+    """
+    Split a problem into (operand1, operator, operand2).
+
+    Parameters:
+        p (str): The problem string.
+        strict (bool): Reject problems that do not have exactly three
+            parts and operands that are not ASCII digits.
+            arithmetic_arranger() passes False to keep its original
+            behaviour: extra parts are ignored (and missing ones raise
+            IndexError).
+
+    Returns:
+        tuple or str: The parts, or an error message if it is invalid.
+    """
+    match = _VALID_PROBLEM.fullmatch(p)
+    if match:
+        return match.groups()
+
+    # Slow path: work out which check fails, in the original order
+    parts = p.split()
+    if strict and len(parts) != 3:
+        return "Error: Problem must be 'number operator number'."
+
+    # Validate operator
+    if parts[1] not in OPS:
+        return "Error: Operator must be '+' or '-'."
+
+    # Validate numeric operands (strict: ASCII digits, as int() needs;
+    # arithmetic_arranger() keeps the original isnumeric() check)
+    if strict:
+        operands_ok = all(part.isascii() and part.isdecimal()
+                          for part in (parts[0], parts[2]))
+    else:
+        operands_ok = parts[0].isnumeric() and parts[2].isnumeric()
+    if not operands_ok:
+        return "Error: Numbers must only contain digits."
+
+    # Validate operand length
+    if len(parts[0]) > 4 or len(parts[2]) > 4:
+        return "Error: Numbers cannot be more than four digits."
+
+    if not strict:
+        # The original converted each problem right after checking it,
+        # so a numeric non-digit such as "²" raised ValueError here
+        int(parts[0]), int(parts[2])
+
+    return tuple(parts[:3])
+
+
+def _format_problems(problem, show_answer):
+    """
+    Format parsed problems side by side.
+    """
 
     # ------------------------------------------------
     # Containers for each output line
@@ -33,28 +170,11 @@ def arithmetic_arranger(problems, show_answer=False):
     dashes = []   # Separator lines
     answers = []  # Computed results
 
-    # Split each problem into components: operand1, operator, operand2
-    problem = []
-    for p in problems:
-        problem.append(p.split())
-
     # ------------------------------------------------
     # Process each arithmetic problem
     # ------------------------------------------------
     for p in problem:
 
-        # Validate operator
-        if p[1] not in ops:
-            return "Error: Operator must be '+' or '-'."
-
-        # Validate numeric operands
-        if not p[0].isnumeric() or not p[2].isnumeric():
-            return "Error: Numbers must only contain digits."
-
-        # Validate operand length
-        if len(p[0]) > 4 or len(p[2]) > 4:
-            return "Error: Numbers cannot be more than four digits."
-
         # ------------------------------------------------
         # Determine spacing and alignment
         # ------------------------------------------------
@@ -70,9 +190,10 @@ def arithmetic_arranger(problems, show_answer=False):
         # Dash line
         dashes.append("-" * width)
 
-        # Calculate answer
-        result = ops[p[1]](int(p[0]), int(p[2]))
-        answers.append(str(result).rjust(width))
+        # Calculate answer only if requested
+        if show_answer:
+            result = OPS[p[1]](int(p[0]), int(p[2]))
+            answers.append(str(result).rjust(width))
 
     # ------------------------------------------------
     # Combine all problems into formatted strings
@@ -80,13 +201,167 @@ def arithmetic_arranger(problems, show_answer=False):
     line1_string = "    ".join(line1)
     line2_string = "    ".join(line2)
     dashes_string = "    ".join(dashes)
-    answer_string = "    ".join(answers)
 
     final_output = [line1_string, line2_string, dashes_string]
 
     # Include answers only if requested
     if show_answer:
-        final_output.append(answer_string)
+        final_output.append("    ".join(answers))
 
     # Join lines with newline characters for vertical display
     return "\n".join(final_output)
+
+
+# ------------------------------------------------
+# Command-line worksheet generator
+# ------------------------------------------------
+def main(argv=None):
+    """
+    Format problems read from a file or stdin into worksheet pages.
+
+    Each input line holds one problem (blank lines are ignored). Chunks
+    of problems are formatted on a process pool and written in input
+    order, separated by blank lines; at most 2 * workers chunks are read
+    ahead of the output. Invalid problems are listed on stderr with their
+    line numbers in the input and make the exit status 1.
+
+    Example:
+        python arithmetic_arranger.py problems.txt -o sheet.txt -a -w 4
+    """
+    parser = argparse.ArgumentParser(
+        description="Arrange arithmetic problems into worksheet pages."
+    )
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file with one problem per line (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file (default: stdout)")
+    parser.add_argument("-a", "--answers", action="store_true",
+                        help="include the answers")
+    parser.add_argument("-p", "--page-size", type=int, default=5,
+                        help="problems per page (default: 5)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes (default: 1)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=10000,
+                        help="problems per task (default: 10000)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not report progress on stderr")
+    args = parser.parse_args(argv)
+    for option, value in (("--page-size", args.page_size),
+                          ("--workers", args.workers),
+                          ("--chunk-size", args.chunk_size)):
+        if value < 1:
+            parser.error(f"{option} must be at least 1")
+
+    # Keep chunks a whole number of pages so pagination does not change
+    chunk_size = max(args.chunk_size // args.page_size, 1) * args.page_size
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    target = sys.stdout if args.output == "-" else \
+        open(args.output, "w", buffering=1 << 20)
+
+    # Problems with their line numbers (blank lines are skipped)
+    problems = (
+        (number, problem)
+        for number, problem in enumerate(map(str.strip, source), 1)
+        if problem
+    )
+    tasks = (
+        ([problem for _, problem in chunk],
+         array("L", [number for number, _ in chunk]),
+         args.answers, args.page_size)
+        for chunk in _iter_chunks(problems, chunk_size)
+    )
+
+    done = 0
+    num_errors = 0
+    started = time.perf_counter()
+    separator = ""
+    try:
+        if args.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=args.workers)
+            results = _map_ordered(pool, _format_chunk, tasks,
+                                   2 * args.workers)
+        else:
+            pool = None
+            results = map(_format_chunk, tasks)
+
+        for text, count, errors in results:
+            if text:
+                target.write(separator + text)
+                separator = "\n\n"
+            # Start on a fresh line if a progress line is showing
+            if errors and done and not args.quiet:
+                print(file=sys.stderr)
+            for number, problem, message in errors:
+                print(f"Line {number} ({problem!r}): {message}",
+                      file=sys.stderr)
+            num_errors += len(errors)
+            done += count
+
+            if not args.quiet:
+                rate = done / max(time.perf_counter() - started, 1e-9)
+                print(f"\r{done:,} problems, {rate:,.0f} problems/s",
+                      end="", file=sys.stderr)
+        target.write("\n")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+        else:
+            target.flush()
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    return 1 if num_errors else 0
+
+
+def _map_ordered(pool, function, tasks, window):
+    """
+    Like pool.map(), but submit at most window tasks ahead of the
+    result being yielded, so the input is read only as fast as the
+    output is consumed.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(function, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _iter_chunks(problems, size):
+    """
+    Split an iterable of problems into lists of at most size problems.
+    """
+    problems = iter(problems)
+    while True:
+        chunk = list(islice(problems, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _format_chunk(task):
+    """
+    Format one chunk of problems into pages (run in a worker process).
+
+    Returns:
+        tuple: (pages joined by blank lines, number of problems,
+            errors with the input line number of each problem)
+    """
+    chunk, line_numbers, show_answer, page_size = task
+    errors = []
+    pages = arrange_pages(chunk, show_answer, page_size, errors)
+    text = "\n\n".join(pages)
+    return text, len(chunk), [
+        (line_numbers[index], problem, message)
+        for index, problem, message in errors
+    ]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
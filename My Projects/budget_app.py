@@ -1,6 +1,269 @@
+import csv
+import mmap
+import os
+import pickle
+import random
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from contextlib import ExitStack
+from datetime import date, datetime
+from itertools import accumulate, count, islice
+
+
+class Ledger:
+    """
+    A columnar transaction ledger.
+
+    Amounts are kept in a float array, descriptions are interned and
+    stored as integer ids, and timestamps (optional) live in a third
+    array. Running totals make the balance and the withdrawal total
+    available in O(1), and a time-sorted index with prefix sums answers
+    totals over a time range in O(log n).
+
+    Indexing or iterating yields the familiar entry dicts, e.g.
+    {"amount": -10.0, "description": "groceries"}, built on demand.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty ledger.
+        """
+        self.amounts = array("d")
+        self.description_ids = array("I")
+        self.descriptions = []       # Interned description strings
+        self._description_index = {}
+        self.timestamps = None       # Created on the first timestamp
+        self.balance = 0
+        self.withdrawals = 0
+        self.journal = None          # Logs and applies entries (store)
+
+        # Time index: sorted timestamps with prefix sums of deposits and
+        # withdrawals, covering the first _indexed entries of the ledger
+        self._index_times = array("d")
+        self._index_deposited = array("d", [0.0])
+        self._index_withdrawn = array("d", [0.0])
+        self._indexed = 0
+
+    # ------------------------------------------------
+    # Adding entries
+    # ------------------------------------------------
+    def add(self, amount, description="", timestamp=None):
+        """
+        Record one transaction.
+
+        Parameters:
+            amount (float): Signed amount (negative for withdrawals).
+            description (str): Description of the transaction.
+            timestamp (float, optional): POSIX time of the transaction.
+        """
+        if self.journal is not None:
+            self.journal([(self, [amount], [description], [timestamp])])
+        else:
+            self._add(amount, description, timestamp)
+
+    def extend(self, amounts, descriptions, timestamps=None):
+        """
+        Record many transactions at once.
+
+        Parameters:
+            amounts (list): Signed amounts.
+            descriptions (list): Matching descriptions.
+            timestamps (list, optional): Matching POSIX times (or None
+                entries for transactions without one).
+        """
+        if timestamps is None:
+            timestamps = [None] * len(amounts)
+        if self.journal is not None:
+            self.journal([(self, amounts, descriptions, timestamps)])
+        else:
+            self._extend(amounts, descriptions, timestamps)
+
+    def _add(self, amount, description, timestamp):
+        """
+        Apply one transaction in memory.
+        """
+        description_id = self._description_index.get(description)
+        if description_id is None:
+            description_id = len(self.descriptions)
+            self._description_index[description] = description_id
+            self.descriptions.append(description)
+
+        if timestamp is not None and self.timestamps is None:
+            self.timestamps = array("d", [float("nan")]) * len(self.amounts)
+        if self.timestamps is not None:
+            self.timestamps.append(
+                float("nan") if timestamp is None else timestamp
+            )
+
+        self.amounts.append(amount)
+        self.description_ids.append(description_id)
+        self.balance += amount
+        if amount < 0:
+            self.withdrawals -= amount
+
+    def _extend(self, amounts, descriptions, timestamps):
+        """
+        Apply many transactions in memory.
+        """
+        index = self._description_index
+        ids = []
+        for description in descriptions:
+            description_id = index.get(description)
+            if description_id is None:
+                description_id = len(self.descriptions)
+                index[description] = description_id
+                self.descriptions.append(description)
+            ids.append(description_id)
+
+        if self.timestamps is None and any(
+                timestamp is not None for timestamp in timestamps):
+            self.timestamps = array("d", [float("nan")]) * len(self.amounts)
+        if self.timestamps is not None:
+            self.timestamps.extend([
+                float("nan") if timestamp is None else timestamp
+                for timestamp in timestamps
+            ])
+        self.amounts.extend(amounts)
+        self.description_ids.extend(ids)
+        for amount in amounts:
+            self.balance += amount
+            if amount < 0:
+                self.withdrawals -= amount
+
+    def append(self, entry):
+        """
+        Record a transaction given as an entry dict (list compatibility).
+        """
+        self.add(entry["amount"], entry.get("description", ""),
+                 entry.get("timestamp"))
+
+    # ------------------------------------------------
+    # Time range queries
+    # ------------------------------------------------
+    def range_totals(self, start=None, end=None):
+        """
+        Total deposits and withdrawals with start <= timestamp < end.
+
+        Entries without a timestamp are not part of any range.
+
+        Parameters:
+            start (float, optional): POSIX time; None means unbounded.
+            end (float, optional): POSIX time; None means unbounded.
+
+        Returns:
+            tuple: (deposited, withdrawn), both as positive amounts.
+        """
+        self._update_index()
+        times = self._index_times
+        low = 0 if start is None else bisect_left(times, start)
+        high = len(times) if end is None else bisect_left(times, end)
+        if high <= low:
+            return 0.0, 0.0
+
+        deposited = self._index_deposited
+        withdrawn = self._index_withdrawn
+        return (deposited[high] - deposited[low],
+                withdrawn[high] - withdrawn[low])
+
+    def _update_index(self):
+        """
+        Bring the time index up to date with the ledger.
+
+        Entries appended in time order extend the index in place; an
+        out-of-order timestamp triggers a full rebuild.
+        """
+        if self.timestamps is None or self._indexed == len(self.amounts):
+            return
+
+        times = self._index_times
+        deposited = self._index_deposited
+        withdrawn = self._index_withdrawn
+        for i in range(self._indexed, len(self.amounts)):
+            timestamp = self.timestamps[i]
+            if timestamp != timestamp:  # NaN: no timestamp
+                continue
+            if times and timestamp < times[-1]:
+                self._rebuild_index()
+                return
+            amount = self.amounts[i]
+            times.append(timestamp)
+            deposited.append(deposited[-1] + max(amount, 0.0))
+            withdrawn.append(withdrawn[-1] + max(-amount, 0.0))
+        self._indexed = len(self.amounts)
+
+    def _rebuild_index(self):
+        """
+        Sort all timestamped entries and recompute the prefix sums.
+        """
+        entries = sorted(
+            (timestamp, amount)
+            for timestamp, amount in zip(self.timestamps, self.amounts)
+            if timestamp == timestamp
+        )
+        self._index_times = array("d", [t for t, _ in entries])
+        self._index_deposited = array("d", accumulate(
+            (max(a, 0.0) for _, a in entries), initial=0.0))
+        self._index_withdrawn = array("d", accumulate(
+            (max(-a, 0.0) for _, a in entries), initial=0.0))
+        self._indexed = len(self.amounts)
+
+    # ------------------------------------------------
+    # List-of-dicts view
+    # ------------------------------------------------
+    def entry(self, index):
+        """
+        Build the entry dict for one transaction.
+        """
+        entry = {
+            "amount": self.amounts[index],
+            "description": self.descriptions[self.description_ids[index]]
+        }
+        if self.timestamps is not None:
+            timestamp = self.timestamps[index]
+            if timestamp == timestamp:  # Skip NaN (no timestamp)
+                entry["timestamp"] = timestamp
+        return entry
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ledger index out of range")
+        return self.entry(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.entry(index)
+
+    def __eq__(self, other):
+        if isinstance(other, (Ledger, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+# Global creation order of categories, used to order lock acquisition
+_category_order = count()
+
+
 class Category:
     """
     A budget category that tracks deposits, withdrawals, and transfers.
+
+    Every category has its own lock, so it can be shared between threads.
+    Transfers lock both categories in creation order, which rules out
+    deadlocks between transfers running in opposite directions.
     """
 
     def __init__(self, name):
@@ -11,9 +274,23 @@ class Category:
             name (str): Name of the budget category.
         """
         self.name = name
-        self.ledger = []
-        self.total_amount = 0
-        self.withdraw_amount = 0
+        self.ledger = Ledger()
+        self.lock = threading.RLock()
+        self.order = next(_category_order)
+
+    @property
+    def total_amount(self):
+        """
+        Current balance, kept as a running total by the ledger.
+        """
+        return self.ledger.balance
+
+    @property
+    def withdraw_amount(self):
+        """
+        Total amount withdrawn, kept as a running total by the ledger.
+        """
+        return self.ledger.withdrawals
 
     # ------------------------------------------------
     # Utility methods
@@ -33,77 +310,183 @@ class Category:
     # ------------------------------------------------
     # Transaction methods
     # ------------------------------------------------
-    def deposit(self, amount, description=None):
+    def deposit(self, amount, description=None, timestamp=None):
         """
         Deposit money into the category.
 
         Parameters:
             amount (float): Amount to deposit.
             description (str, optional): Description of the transaction.
+            timestamp (datetime, date or float, optional): When the
+                transaction happened.
         """
-        entry = {
-            "amount": amount,
-            "description": description if description is not None else ""
-        }
+        with self.lock:
+            self.ledger.add(
+                amount, description if description is not None else "",
+                _to_timestamp(timestamp)
+            )
 
-        self.ledger.append(entry)
-        self.total_amount += amount
-
-    def withdraw(self, amount, description=None):
+    def withdraw(self, amount, description=None, timestamp=None):
         """
         Withdraw money from the category if sufficient funds exist.
 
         Parameters:
             amount (float): Amount to withdraw.
             description (str, optional): Description of the transaction.
+            timestamp (datetime, date or float, optional): When the
+                transaction happened.
 
         Returns:
             bool: True if withdrawal was successful, otherwise False.
         """
-        if not self.check_funds(amount):
-            return False
-
-        entry = {
-            "amount": -amount,
-            "description": description if description is not None else ""
-        }
+        with self.lock:
+            if not self.check_funds(amount):
+                return False
 
-        self.ledger.append(entry)
-        self.total_amount -= amount
-        self.withdraw_amount += amount
-        return True
+            self.ledger.add(
+                -amount, description if description is not None else "",
+                _to_timestamp(timestamp)
+            )
+            return True
 
-    def transfer(self, amount, category):
+    def transfer(self, amount, category, timestamp=None):
         """
         Transfer money from this category to another category.
 
         Parameters:
             amount (float): Amount to transfer.
             category (Category): Target category.
+            timestamp (datetime, date or float, optional): When the
+                transfer happened.
 
         Returns:
             bool: True if transfer was successful, otherwise False.
         """
+        with _locked(self, category):
+            return self._transfer_locked(amount, category, timestamp)
+
+    def _transfer_locked(self, amount, category, timestamp=None):
+        """
+        Transfer money; the caller must hold both categories' locks.
+        """
         if not self.check_funds(amount):
             return False
 
-        # Record withdrawal from current category
-        self.ledger.append({
-            "amount": -amount,
-            "description": f"Transfer to {category.name.capitalize()}"
-        })
-        self.total_amount -= amount
-        self.withdraw_amount += amount
-
-        # Record deposit into target category
-        category.ledger.append({
-            "amount": amount,
-            "description": f"Transfer from {self.name.capitalize()}"
-        })
-        category.total_amount += amount
+        # Record the withdrawal from this category and the deposit into
+        # the target category as one unit
+        timestamp = _to_timestamp(timestamp)
+        _record([
+            (self.ledger, [-amount],
+             [f"Transfer to {category.name.capitalize()}"], [timestamp]),
+            (category.ledger, [amount],
+             [f"Transfer from {self.name.capitalize()}"], [timestamp]),
+        ])
 
         return True
 
+    # ------------------------------------------------
+    # Bulk transaction methods
+    # ------------------------------------------------
+    def deposit_many(self, rows):
+        """
+        Deposit a batch of transactions.
+
+        Parameters:
+            rows (iterable): Amounts, (amount, description) pairs,
+                (amount, description, timestamp) triples or entry dicts.
+
+        Returns:
+            bool: Always True (deposits cannot fail).
+        """
+        amounts, descriptions, timestamps = _split_rows(rows)
+        with self.lock:
+            self.ledger.extend(amounts, descriptions, timestamps)
+        return True
+
+    def withdraw_many(self, rows):
+        """
+        Withdraw a batch of transactions, all of them or none.
+
+        Parameters:
+            rows (iterable): Amounts, (amount, description) pairs,
+                (amount, description, timestamp) triples or entry dicts,
+                with positive amounts to withdraw.
+
+        Returns:
+            bool: True if the batch was applied, False if any withdrawal
+                would have exceeded the funds available at that point.
+        """
+        amounts, descriptions, timestamps = _split_rows(rows)
+        return self.apply_batch(list(zip(
+            [-amount for amount in amounts], descriptions, timestamps
+        )))
+
+    def apply_batch(self, rows):
+        """
+        Apply a batch of signed transactions, all of them or none.
+
+        Negative amounts are withdrawals and must be covered by the
+        balance reached after the preceding rows of the batch.
+
+        Parameters:
+            rows (iterable): Signed amounts, (amount, description) pairs,
+                (amount, description, timestamp) triples or entry dicts.
+
+        Returns:
+            bool: True if the batch was applied, otherwise False.
+        """
+        amounts, descriptions, timestamps = _split_rows(rows)
+        with self.lock:
+            if not _batch_is_funded(self.total_amount, amounts):
+                return False
+
+            self.ledger.extend(amounts, descriptions, timestamps)
+            return True
+
+    def import_csv(self, path, chunk_size=10000, amount_column="amount",
+                   description_column="description"):
+        """
+        Stream signed transactions from a CSV file, all of them or none.
+
+        The file is read twice: once to check that every withdrawal is
+        covered, then once more to apply the rows chunk by chunk, so the
+        whole file is never held in memory.
+
+        "All or none" refers to the funds check. For a category of a
+        LedgerStore each chunk is logged as its own group, so a crash
+        during the import persists the chunks logged so far; use
+        apply_batch() when the rows must also be crash-atomic.
+
+        Parameters:
+            path (str): Path to a CSV file with a header row.
+            chunk_size (int): Number of rows applied at a time.
+            amount_column (str): Header of the signed amount column.
+            description_column (str): Header of the description column.
+
+        Returns:
+            bool: True if the file was applied, otherwise False.
+        """
+        def read_rows():
+            with open(path, newline="") as file:
+                for row in csv.DictReader(file):
+                    yield (float(row[amount_column]),
+                           row.get(description_column) or "")
+
+        with self.lock:
+            balance = self.total_amount
+            for amount, _ in read_rows():
+                if amount < 0 and -amount > balance:
+                    return False
+                balance += amount
+
+            rows = read_rows()
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    return True
+                amounts, descriptions, _ = _split_rows(chunk)
+                self.ledger.extend(amounts, descriptions)
+
     # ------------------------------------------------
     # Accessors and string representation
     # ------------------------------------------------
@@ -113,62 +496,231 @@ class Category:
         """
         return self.total_amount
 
+    def get_spending(self, start=None, end=None):
+        """
+        Return the amount withdrawn between start (inclusive) and end
+        (exclusive). Without bounds this is the total withdrawn; with
+        bounds only timestamped transactions are counted.
+
+        Parameters:
+            start (datetime, date or float, optional): Start of the period.
+            end (datetime, date or float, optional): End of the period.
+        """
+        if start is None and end is None:
+            return self.withdraw_amount
+        with self.lock:
+            return self.ledger.range_totals(
+                _to_timestamp(start), _to_timestamp(end)
+            )[1]
+
     def __str__(self):
         """
         Return a formatted string representation of the ledger.
         """
-        title = f"{self.name.capitalize():*^30}\n"
-        body = ""
+        return "".join(self.iter_statement())
+
+    def iter_statement(self):
+        """
+        Yield the ledger statement piece by piece, one line at a time.
 
-        for item in self.ledger:
-            description = item["description"][:23]
-            amount = item["amount"]
+        Joining the pieces gives the same text as str(category). The
+        statement covers the entries recorded when it starts; entries
+        added by other threads while it is being rendered are left out.
+        """
+        yield f"{self.name.capitalize():*^30}\n"
+
+        ledger = self.ledger
+        amounts = ledger.amounts
+        description_ids = ledger.description_ids
+
+        # Capture the entries and balance under the lock; the ledger
+        # appends amounts before description ids, so count the ids
+        with self.lock:
+            num_entries = len(description_ids)
+            balance = self.get_balance()
 
+            # Descriptions are interned, so pad each distinct one only once
+            padded = [f"{d[:23]:<23}" for d in ledger.descriptions]
+
+        for i in range(num_entries):
             # Align amount to the right with two decimal places
-            body += f"{description:<23}{amount:>7.2f}\n"
+            yield f"{padded[description_ids[i]]}{amounts[i]:>7.2f}\n"
 
-        total = f"Total: {self.get_balance():.2f}"
-        return title + body + total
+        yield f"Total: {balance:.2f}"
 
+    def write_statement(self, stream, chunk_size=4096):
+        """
+        Write the ledger statement to a text stream in chunks.
 
-def create_spend_chart(categories):
+        Parameters:
+            stream: Any object with a write(str) method.
+            chunk_size (int): Number of lines joined per write.
+        """
+        _write_chunks(stream, self.iter_statement(), chunk_size)
+
+
+def transfer_many(transfers):
+    """
+    Apply many transfers while taking each category's lock only once.
+
+    All categories involved are locked up front in creation order, then
+    the transfers run in the given order; each one succeeds or fails on
+    its own exactly as Category.transfer() would.
+
+    Parameters:
+        transfers (iterable): (source, target, amount) tuples, or
+            (source, target, amount, timestamp) tuples for timestamped
+            transfers.
+
+    Returns:
+        list: One bool per transfer, True if it was applied.
+    """
+    transfers = [
+        transfer if len(transfer) == 4 else (*transfer, None)
+        for transfer in transfers
+    ]
+    categories = [
+        category for source, target, _, _ in transfers
+        for category in (source, target)
+    ]
+
+    with _locked(*categories):
+        return [
+            source._transfer_locked(amount, target, timestamp)
+            for source, target, amount, timestamp in transfers
+        ]
+
+
+def _record(changes):
+    """
+    Record changes to several ledgers, as one journal entry when all of
+    them share a journal (e.g. categories of the same LedgerStore).
+
+    Parameters:
+        changes (list): (ledger, amounts, descriptions, timestamps) tuples.
+    """
+    journal = changes[0][0].journal
+    if journal is not None and all(
+            ledger.journal == journal for ledger, *_ in changes):
+        journal(changes)
+        return
+
+    for ledger, amounts, descriptions, timestamps in changes:
+        if ledger.journal is not None:
+            ledger.journal([(ledger, amounts, descriptions, timestamps)])
+        else:
+            ledger._extend(amounts, descriptions, timestamps)
+
+
+def _locked(*categories):
+    """
+    Lock the given categories in their global creation order.
+    """
+    stack = ExitStack()
+    unique = {category.order: category for category in categories}
+    for order in sorted(unique):
+        stack.enter_context(unique[order].lock)
+    return stack
+
+
+def _to_timestamp(value):
+    """
+    Convert a datetime, date or number to a POSIX timestamp (or None).
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).timestamp()
+    return float(value)
+
+
+def _split_rows(rows):
+    """
+    Split bulk rows into parallel amount, description and timestamp lists.
+
+    Each row is an amount, an (amount, description) pair, an
+    (amount, description, timestamp) triple or an entry dict with
+    "amount" and optional "description" and "timestamp" keys. Timestamps
+    are converted with _to_timestamp() (None where a row has none).
+    """
+    amounts = []
+    descriptions = []
+    timestamps = []
+    for row in rows:
+        timestamp = None
+        if isinstance(row, dict):
+            amount, description = row["amount"], row.get("description")
+            timestamp = row.get("timestamp")
+        elif isinstance(row, (tuple, list)):
+            if len(row) == 3:
+                amount, description, timestamp = row
+            else:
+                amount, description = row
+        else:
+            amount, description = row, None
+        amounts.append(amount)
+        descriptions.append(description if description is not None else "")
+        timestamps.append(_to_timestamp(timestamp))
+    return amounts, descriptions, timestamps
+
+
+def _batch_is_funded(balance, amounts):
+    """
+    Check that every withdrawal in a batch is covered by the balance
+    reached just before it, using the batch's cumulative sums.
+    """
+    running = accumulate(amounts, initial=balance)
+    return all(
+        amount >= 0 or -amount <= before
+        for amount, before in zip(amounts, running)
+    )
+
+
+def create_spend_chart(categories, start=None, end=None):
     """
     Create a bar chart showing the percentage spent by each category.
 
     Parameters:
         categories (list): A list of Category objects.
+        start (datetime, date or float, optional): Only count spending
+            from this time on.
+        end (datetime, date or float, optional): Only count spending
+            before this time.
 
     Returns:
         str: A formatted percentage spend chart.
     """
+    return "\n".join(iter_spend_chart(categories, start, end))
 
-    # Chart title
-    chart = "Percentage spent by category\n"
 
-    # ------------------------------------------------
-    # Calculate total withdrawals
-    # ------------------------------------------------
-    total_withdrawals = sum(cat.withdraw_amount for cat in categories)
+def iter_spend_chart(categories, start=None, end=None):
+    """
+    Yield the lines of the spend chart (without newlines), so charts
+    for thousands of categories never build one huge string at once.
 
-    # Calculate percentage spent for each category (rounded down to nearest 10)
-    percentages = [
-        int((cat.withdraw_amount / total_withdrawals) * 100) // 10 * 10
-        for cat in categories
-    ]
+    Parameters are the same as for create_spend_chart().
+    """
+
+    # Chart title
+    yield "Percentage spent by category"
+
+    # Percentage spent for each category (rounded down to nearest 10)
+    percentages = _spend_percentages(categories, start, end)
 
     # ------------------------------------------------
     # Build vertical bar chart
     # ------------------------------------------------
     for level in range(100, -1, -10):
-        chart += f"{level:>3}| "
-        for pct in percentages:
-            chart += "o  " if pct >= level else "   "
-        chart += "\n"
+        bars = "".join("o  " if pct >= level else "   "
+                       for pct in percentages)
+        yield f"{level:>3}| {bars}"
 
     # ------------------------------------------------
     # Add horizontal divider
     # ------------------------------------------------
-    chart += "    " + "-" * (len(categories) * 3 + 1) + "\n"
+    yield "    " + "-" * (len(categories) * 3 + 1)
 
     # ------------------------------------------------
     # Add category labels vertically
@@ -177,9 +729,528 @@ def create_spend_chart(categories):
     max_len = max(len(name) for name in names)
 
     for i in range(max_len):
-        chart += "     "
-        for name in names:
-            chart += f"{name[i] if i < len(name) else ' '}  "
-        chart += "\n"
+        letters = "".join(f"{name[i] if i < len(name) else ' '}  "
+                          for name in names)
+        yield "     " + letters
+
+
+def write_spend_chart(stream, categories, start=None, end=None,
+                      chunk_size=64):
+    """
+    Write the spend chart to a text stream in chunks.
+
+    Parameters:
+        stream: Any object with a write(str) method.
+        categories (list): A list of Category objects.
+        start, end (optional): Time window, as for create_spend_chart().
+        chunk_size (int): Number of lines joined per write.
+    """
+    lines = iter_spend_chart(categories, start, end)
+    pieces = (("\n" if i else "") + line for i, line in enumerate(lines))
+    _write_chunks(stream, pieces, chunk_size)
+
+
+# Percentages by (category, ledger length) state and time window
+_percentage_cache = {}
+_PERCENTAGE_CACHE_SIZE = 128
+
+
+def _spend_percentages(categories, start, end):
+    """
+    Return the rounded-down spend percentages, cached until one of the
+    categories records a new transaction.
+    """
+    # Ledgers only grow, so their lengths identify the current state
+    key = (tuple((cat.order, len(cat.ledger)) for cat in categories),
+           start, end)
+    percentages = _percentage_cache.get(key)
+    if percentages is None:
+        spending = [cat.get_spending(start, end) for cat in categories]
+        total_withdrawals = sum(spending)
+        if total_withdrawals == 0:
+            # Nothing spent (e.g. an empty time window): all bars at 0
+            percentages = [0] * len(categories)
+        else:
+            percentages = [
+                int((spent / total_withdrawals) * 100) // 10 * 10
+                for spent in spending
+            ]
+        if len(_percentage_cache) >= _PERCENTAGE_CACHE_SIZE:
+            _percentage_cache.clear()
+        _percentage_cache[key] = percentages
+    return percentages
+
+
+def _write_chunks(stream, pieces, chunk_size):
+    """
+    Write pieces of text to a stream, chunk_size pieces per write.
+    """
+    while True:
+        chunk = "".join(islice(pieces, chunk_size))
+        if not chunk:
+            return
+        stream.write(chunk)
+
+
+# ------------------------------------------------
+# Concurrency stress test and benchmark
+# ------------------------------------------------
+def stress_test_transfers(num_categories=10, num_threads=8,
+                          transfers_per_thread=20000, batch_size=None):
+    """
+    Transfer money between categories at random from many threads and
+    check that the total amount of money is conserved.
+
+    Raises RuntimeError if money was created or lost, a balance went
+    negative, or a ledger disagrees with its running balance.
+
+    Parameters:
+        num_categories (int): Number of categories to transfer between.
+        num_threads (int): Number of concurrent threads.
+        transfers_per_thread (int): Transfers made by each thread.
+        batch_size (int, optional): Use transfer_many() with batches of
+            this size instead of one transfer() per call.
+
+    Returns:
+        float: Transfers per second.
+    """
+    categories = [Category(f"category{i}") for i in range(num_categories)]
+    for category in categories:
+        category.deposit(1000, "initial deposit")
+    expected_total = sum(c.get_balance() for c in categories)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        transfers = [
+            (*rng.sample(categories, 2), rng.randint(1, 50))
+            for _ in range(transfers_per_thread)
+        ]
+        if batch_size is None:
+            for source, target, amount in transfers:
+                source.transfer(amount, target)
+        else:
+            for i in range(0, len(transfers), batch_size):
+                transfer_many(transfers[i:i + batch_size])
+
+    threads = [threading.Thread(target=worker, args=(seed,))
+               for seed in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(c.get_balance() for c in categories)
+    if total != expected_total:
+        raise RuntimeError(
+            f"money not conserved: {total} instead of {expected_total}"
+        )
+    for category in categories:
+        if category.get_balance() < 0:
+            raise RuntimeError(f"negative balance in {category.name}")
+        if sum(category.ledger.amounts) != category.get_balance():
+            raise RuntimeError(
+                f"ledger of {category.name} does not match its balance"
+            )
+
+    return num_threads * transfers_per_thread / elapsed
+
+
+def benchmark_transfers(num_threads=8, transfers_per_thread=20000):
+    """
+    Print transfer throughput for single and batched transfers.
+    """
+    for batch_size in (None, 100, 1000):
+        rate = stress_test_transfers(
+            num_threads=num_threads,
+            transfers_per_thread=transfers_per_thread,
+            batch_size=batch_size,
+        )
+        label = "transfer()" if batch_size is None else \
+            f"transfer_many({batch_size})"
+        print(f"{label:<20} {rate:>12,.0f} transfers/s")
+
+
+# ------------------------------------------------
+# Persistent store
+# ------------------------------------------------
+# Log record: kind, category id, amount, timestamp (NaN if none) and the
+# length of a UTF-8 payload (category name or description), followed by
+# the payload and a CRC32 of everything before it. A group record holds
+# several complete records as its payload (its category id field is their
+# count), so they are replayed all together or not at all.
+_RECORD = struct.Struct("<BIddI")
+_CRC = struct.Struct("<I")
+_NEW_CATEGORY = 0
+_TRANSACTION = 1
+_GROUP = 2
+
+# Snapshot segment header: length and CRC32 of the pickled segment
+_SEGMENT = struct.Struct("<II")
+
+
+class LedgerStore:
+    """
+    Persist categories in an append-only binary log with snapshots.
+
+    Every transaction is appended to "transactions.log" and applied in
+    memory while the store's lock is held, so snapshots (taken under the
+    same lock) never see a logged entry that is not yet applied. The two
+    legs of a transfer, and every bulk batch, are logged as one group
+    record (Category.import_csv() logs one group per chunk).
+
+    Every snapshot_every records, and on close(), a snapshot segment is
+    appended to "snapshots.bin": the balances and withdrawal totals of
+    all changed categories, the entries they gained since the previous
+    segment, and the log offset it covers. Each snapshot therefore costs
+    only the new entries, not the full history.
+    Reopening loads the segments and replays only the log tail through a
+    memory map; a torn final record or segment left by a crash is
+    truncated away.
+
+    Example:
+        with LedgerStore("budget") as store:
+            food = store.category("food")
+            food.deposit(100, "salary")
+    """
+
+    def __init__(self, path, snapshot_every=100000):
+        """
+        Open (or create) a store in the given directory.
+
+        Parameters:
+            path (str): Directory holding the log and snapshot files.
+            snapshot_every (int): Records between automatic snapshots.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.log_path = os.path.join(path, "transactions.log")
+        self.snapshot_path = os.path.join(path, "snapshots.bin")
+        self.snapshot_every = snapshot_every
+        self.categories = {}
+        self._by_id = []
+        self._ids = {}           # id(ledger) -> category id
+        self._snapshotted = []   # (entries, descriptions) per category
+        self._since_snapshot = 0
+        self._lock = threading.RLock()  # Serializes log writes and applies
+
+        offset = self._load_snapshots()
+        end = self._replay(offset)
+
+        self._log = open(self.log_path, "ab")
+        if self._log.tell() != end:
+            self._log.truncate(end)  # Drop a torn final record
+        self._log.seek(end)
+
+        # The log lost records a snapshot already covers (an OS crash
+        # before they reached the disk): the snapshots hold that state,
+        # so record the log's real end before anything is appended
+        if end < offset:
+            self._write_snapshot()
+
+        for category in self._by_id:
+            category.ledger.journal = self._journal
+
+    # ------------------------------------------------
+    # Public interface
+    # ------------------------------------------------
+    def category(self, name):
+        """
+        Return the stored category with this name, creating it if needed.
+        """
+        with self._lock:
+            if name in self.categories:
+                return self.categories[name]
+
+            category_id = len(self._by_id)
+            self._write([(_NEW_CATEGORY, category_id, 0.0, None, name)])
+            category = self._add_category(name)
+            category.ledger.journal = self._journal
+            self._snapshot_if_due()
+            return category
+
+    def snapshot(self):
+        """
+        Append a snapshot segment covering the log written so far.
+
+        Safe to call while other threads modify the categories: the
+        store's lock keeps every logged entry applied before the snapshot
+        is taken.
+        """
+        with self._lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        """
+        Write the snapshot; the caller must hold the store's lock.
+        """
+        # The log must be on disk before a segment claims to cover it
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+        # ------------------------------------------------
+        # Collect what changed since the previous segment
+        # ------------------------------------------------
+        changed = []
+        for category_id, category in enumerate(self._by_id):
+            ledger = category.ledger
+            if category_id < len(self._snapshotted):
+                entries, descriptions = self._snapshotted[category_id]
+                if entries == len(ledger):
+                    continue
+            else:
+                entries, descriptions = 0, 0
+                self._snapshotted.append((0, 0))
+
+            changed.append((
+                category_id,
+                category.name,
+                ledger.amounts[entries:].tobytes(),
+                ledger.description_ids[entries:].tobytes(),
+                ledger.descriptions[descriptions:],
+                None if ledger.timestamps is None
+                else ledger.timestamps[entries:].tobytes(),
+                ledger.balance,
+                ledger.withdrawals,
+            ))
+            self._snapshotted[category_id] = \
+                (len(ledger), len(ledger.descriptions))
+
+        segment = pickle.dumps(
+            {"offset": self._log.tell(), "categories": changed},
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+        # A crash mid-append leaves a torn segment, dropped on loading
+        with open(self.snapshot_path, "ab") as file:
+            file.write(_SEGMENT.pack(len(segment), zlib.crc32(segment)))
+            file.write(segment)
+            file.flush()
+            os.fsync(file.fileno())
+        self._since_snapshot = 0
+
+    def close(self):
+        """
+        Snapshot any unsnapshotted records, then close the log.
+        """
+        with self._lock:
+            if not self._log.closed:
+                if self._since_snapshot:
+                    self._write_snapshot()
+                self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ------------------------------------------------
+    # Loading
+    # ------------------------------------------------
+    def _add_category(self, name):
+        category = Category(name)
+        self.categories[name] = category
+        self._ids[id(category.ledger)] = len(self._by_id)
+        self._by_id.append(category)
+        return category
+
+    def _load_snapshots(self):
+        """
+        Restore categories from the snapshot segments and return the log
+        offset covered by the last complete one.
+        """
+        if not os.path.exists(self.snapshot_path):
+            return 0
+
+        with open(self.snapshot_path, "rb") as file:
+            data = file.read()
+
+        offset = 0
+        position = 0
+        while position + _SEGMENT.size <= len(data):
+            length, crc = _SEGMENT.unpack_from(data, position)
+            start = position + _SEGMENT.size
+            segment = data[start:start + length]
+            if len(segment) != length or zlib.crc32(segment) != crc:
+                break
+            state = pickle.loads(segment)
+            self._restore_segment(state["categories"])
+            offset = state["offset"]
+            position = start + length
+
+        if position != len(data):
+            with open(self.snapshot_path, "r+b") as file:
+                file.truncate(position)  # Drop a torn final segment
+        return offset
+
+    def _restore_segment(self, categories):
+        """
+        Append the entries of one snapshot segment to the categories.
+        """
+        for (category_id, name, amounts, ids, descriptions, timestamps,
+             balance, withdrawals) in categories:
+            if category_id == len(self._by_id):
+                self._add_category(name)
+                self._snapshotted.append((0, 0))
+            ledger = self._by_id[category_id].ledger
+            entries = len(ledger)
+
+            ledger.amounts.frombytes(amounts)
+            ledger.description_ids.frombytes(ids)
+            for description in descriptions:
+                ledger._description_index[description] = \
+                    len(ledger.descriptions)
+                ledger.descriptions.append(description)
+
+            # Pad with NaN where only one side has timestamps
+            added = len(ledger) - entries
+            if timestamps is not None and ledger.timestamps is None:
+                ledger.timestamps = array("d", [float("nan")]) * entries
+            if ledger.timestamps is not None:
+                if timestamps is None:
+                    ledger.timestamps.extend([float("nan")] * added)
+                else:
+                    ledger.timestamps.frombytes(timestamps)
+
+            ledger.balance = balance
+            ledger.withdrawals = withdrawals
+            self._snapshotted[category_id] = \
+                (len(ledger), len(ledger.descriptions))
+
+    def _replay(self, offset):
+        """
+        Apply log records after offset and return the end of the last
+        complete record (the log's size if it ends at or before offset).
+        """
+        if not os.path.exists(self.log_path):
+            return 0
+        if os.path.getsize(self.log_path) <= offset:
+            return os.path.getsize(self.log_path)
+
+        with open(self.log_path, "rb") as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as log:
+            while True:
+                record = _read_record(log, offset)
+                if record is None:
+                    break
+                kind, category_id, amount, timestamp, payload, end = record
+
+                if kind != _GROUP:
+                    self._apply_record(kind, category_id, amount, timestamp,
+                                       payload)
+                    offset = end
+                    continue
+
+                # A group is applied only if all its records are intact
+                records = []
+                position = 0
+                while len(records) < category_id:
+                    inner = _read_record(payload, position)
+                    if inner is None:
+                        break
+                    records.append(inner[:5])
+                    position = inner[5]
+                if len(records) != category_id or position != len(payload):
+                    break
+                for inner in records:
+                    self._apply_record(*inner)
+                offset = end
+
+        return offset
+
+    def _apply_record(self, kind, category_id, amount, timestamp, payload):
+        """
+        Apply one replayed log record in memory.
+        """
+        text = bytes(payload).decode("utf-8")
+        if kind == _NEW_CATEGORY:
+            self._add_category(text)
+        else:
+            self._by_id[category_id].ledger._add(
+                amount, text, None if timestamp != timestamp else timestamp
+            )
+
+    # ------------------------------------------------
+    # Writing
+    # ------------------------------------------------
+    def _journal(self, changes):
+        """
+        Log ledger changes as one unit, then apply them in memory.
+
+        Parameters:
+            changes (list): (ledger, amounts, descriptions, timestamps)
+                tuples for ledgers of this store.
+        """
+        with self._lock:
+            self._write([
+                (_TRANSACTION, self._ids[id(ledger)], amount, timestamp,
+                 description)
+                for ledger, amounts, descriptions, timestamps in changes
+                for amount, description, timestamp
+                in zip(amounts, descriptions, timestamps)
+            ])
+            for ledger, amounts, descriptions, timestamps in changes:
+                ledger._extend(amounts, descriptions, timestamps)
+            self._snapshot_if_due()
+
+    def _snapshot_if_due(self):
+        """
+        Take the automatic snapshot once enough records were logged.
+        """
+        if self._since_snapshot >= self.snapshot_every:
+            self._write_snapshot()
+
+    def _write(self, records):
+        """
+        Append records to the log in a single write; several records are
+        wrapped in one group record so they replay all or nothing.
+        """
+        with self._lock:
+            data = b"".join(_pack_record(*record) for record in records)
+            if len(records) > 1:
+                data = _pack_record(_GROUP, len(records), 0.0, None, data)
+
+            self._log.write(data)
+            self._log.flush()
+            self._since_snapshot += len(records)
+
+
+def _pack_record(kind, category_id, amount, timestamp, payload):
+    """
+    Encode one log record; a str payload is stored as UTF-8.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    record = _RECORD.pack(
+        kind, category_id, amount,
+        float("nan") if timestamp is None else timestamp,
+        len(payload)
+    ) + payload
+    return record + _CRC.pack(zlib.crc32(record))
+
+
+def _read_record(buffer, offset):
+    """
+    Decode the log record at offset.
+
+    Returns:
+        tuple: (kind, category id, amount, timestamp, payload, end of the
+            record), or None if the record is incomplete or corrupt.
+    """
+    if offset + _RECORD.size > len(buffer):
+        return None
+    kind, category_id, amount, timestamp, length = \
+        _RECORD.unpack_from(buffer, offset)
+    end = offset + _RECORD.size + length + _CRC.size
+    if end > len(buffer):
+        return None
+    (crc,) = _CRC.unpack_from(buffer, end - _CRC.size)
+    if zlib.crc32(buffer[offset:end - _CRC.size]) != crc:
+        return None
+    payload = buffer[offset + _RECORD.size:end - _CRC.size]
+    return kind, category_id, amount, timestamp, payload, end
+
 
-    return chart.rstrip("\n")
+if __name__ == "__main__":
+    benchmark_transfers()
@@ -1,20 +1,18 @@
-# Read input and split into two date strings
-dates = input().split('),')
+import argparse
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count, islice
+
+import numpy as np
 
 # Number of days in each month (non-leap year)
 month_list = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-days = 0
 
-# ------------------------------------------------
-# Clean and parse input dates
-# ------------------------------------------------
-# Remove parentheses and convert each date into a list of integers:
-# [year, month, day]
-for i in range(2):
-    dates[i] = dates[i].strip()
-    dates[i] = dates[i].strip("(")
-    dates[i] = dates[i].strip(")")
-    dates[i] = list(map(int, dates[i].split(",")))
+# Days in a non-leap year before the first day of each month
+days_before_month = [0]
+for length in month_list[:-1]:
+    days_before_month.append(days_before_month[-1] + length)
 
 
 # ------------------------------------------------
@@ -36,67 +34,252 @@ def isleap(n):
 
 
 # ------------------------------------------------
-# Ensure the first date is earlier than the second
+# Count days from a fixed starting point
 # ------------------------------------------------
-# Swap dates if necessary to maintain chronological order
-if dates[0][0] > dates[1][0]:
-    dates[0], dates[1] = dates[1], dates[0]
-elif dates[0][0] == dates[1][0]:
-    if dates[0][1] > dates[1][1]:
-        dates[0], dates[1] = dates[1], dates[0]
-    elif dates[0][1] == dates[1][1]:
-        if dates[0][2] > dates[1][2]:
-            dates[0], dates[1] = dates[1], dates[0]
+def day_ordinal(year, month, day):
+    """
+    Return the number of the day, counting 0001-01-01 as day 1.
+
+    Leap days in earlier years are counted with the leap-year formula
+    instead of a loop, so any date costs the same.
+
+    Parameters:
+        year (int), month (int), day (int): The date.
+
+    Returns:
+        int: Day number of the date.
+    """
+    years = year - 1
+    leap_days = years // 4 - years // 100 + years // 400
+
+    # Feb 29 of this year is already behind us from March on
+    if month > 2:
+        leap_days += isleap(year)
+
+    return years * 365 + leap_days + days_before_month[month - 1] + day
+
+
+def days_between(date1, date2):
+    """
+    Calculate the number of days between two dates.
+
+    Parameters:
+        date1 (tuple): First date as (year, month, day).
+        date2 (tuple): Second date as (year, month, day).
+
+    Returns:
+        int: Number of days between the dates (never negative).
+    """
+    return abs(day_ordinal(*date2) - day_ordinal(*date1))
 
 
 # ------------------------------------------------
-# Assign date components for readability
+# Clean and parse input dates
 # ------------------------------------------------
-year1, month1, day1 = dates[0]
-year2, month2, day2 = dates[1]
+def parse_dates(line):
+    """
+    Parse a line such as "(2020,1,1),(2021,3,1)" into two dates.
+
+    Parameters:
+        line (str): Two dates in (year,month,day) form.
+
+    Returns:
+        list: Two [year, month, day] lists of integers.
+    """
+    # Split into two date strings, then remove parentheses and convert
+    # each date into a list of integers: [year, month, day]
+    dates = line.split('),')
+    for i in range(2):
+        dates[i] = dates[i].strip()
+        dates[i] = dates[i].strip("(")
+        dates[i] = dates[i].strip(")")
+        dates[i] = list(map(int, dates[i].split(",")))
+    return dates
 
 
 # ------------------------------------------------
-# Calculate the number of days between the two dates
+# Bulk mode: many date pairs as NumPy arrays
 # ------------------------------------------------
-# Case 1: Same year and same month
-if year1 == year2 and month1 == month2:
-    days = day2 - day1
-else:
-    # Difference in years
-    years = year2 - year1
+# Turns "(2020,1,1),(2021,3,1)" into "  2020 1 1    2021 3 1 "
+_SEPARATORS = str.maketrans("(),", "   ")
+_DAYS_BEFORE_MONTH = np.array(days_before_month, dtype=np.int64)
 
-    # Remaining days in the starting month
-    days += month_list[month1 - 1] - day1
-    if days < 0:
-        days = 0
 
-    # Add full months between the two dates
-    for i in range(month1, month2 + 12 * years):
-        days += month_list[i % 12]
+def isleap_array(years):
+    """
+    Vectorized isleap(): 1 for leap years, otherwise 0.
+    """
+    return (((years % 4 == 0) & (years % 100 != 0))
+            | (years % 400 == 0)).astype(np.int64)
 
-    # Adjust for the ending month
-    days = days - month_list[month2 - 1] + day2
 
+def day_ordinals(years, months, days):
+    """
+    Vectorized day_ordinal() over arrays of years, months and days.
 
-# ------------------------------------------------
-# Adjust for leap years
-# ------------------------------------------------
-# Add leap day if the first date is before Feb 29 in a leap year
-if month1 <= 2:
-    if isleap(year1):
-        if day1 < 29:
-            days += 1
+    Raises:
+        ValueError: If a month is outside 1..12.
+    """
+    if ((months < 1) | (months > 12)).any():
+        raise ValueError("Months must be between 1 and 12.")
+
+    previous = years - 1
+    leap_days = previous // 4 - previous // 100 + previous // 400
+    leap_days += np.where(months > 2, isleap_array(years), 0)
+    return previous * 365 + leap_days + _DAYS_BEFORE_MONTH[months - 1] + days
 
-# Add leap days for full years between the two dates
-if year2 > year1:
-    t = 1 if month2 > 2 else 0
-    for i in range(year1 + 1, year2 + t):
-        if isleap(i):
-            days += 1
+
+def parse_pairs(text, first_line=1):
+    """
+    Parse lines of "(y,m,d),(y,m,d)" pairs into an (n, 6) int64 array.
+
+    Parentheses and commas become spaces and NumPy reads all the numbers
+    in one call, so no Python objects are created per line. The numbers
+    on each line are counted from the text's bytes to check that every
+    non-blank line holds exactly six.
+
+    Parameters:
+        text (str): One pair per line.
+        first_line (int): Line number of the first line, for errors.
+
+    Raises:
+        ValueError: If a line does not contain exactly six numbers, or a
+            month is outside 1..12.
+    """
+    text = text.translate(_SEPARATORS)
+
+    # ------------------------------------------------
+    # Count the numbers starting on each line
+    # ------------------------------------------------
+    data = np.frombuffer(text.encode(), dtype=np.uint8)
+    digit = (data >= ord("0")) & (data <= ord("9"))
+    starts = digit.copy()
+    starts[1:] &= ~digit[:-1]
+    line_of = np.cumsum(data == ord("\n"))
+    per_line = np.bincount(line_of[starts], minlength=line_of[-1] + 1) \
+        if data.size else np.zeros(0, dtype=np.int64)
+
+    bad = np.flatnonzero((per_line != 0) & (per_line != 6))
+    if bad.size:
+        raise ValueError(
+            f"Line {first_line + bad[0]}: expected two (year,month,day) "
+            f"dates, found {per_line[bad[0]]} numbers."
+        )
+
+    pairs = np.fromstring(text, dtype=np.int64, sep=" ").reshape(-1, 6)
+
+    # Rows map to the non-blank lines, in order
+    months = pairs[:, [1, 4]]
+    bad = np.flatnonzero(((months < 1) | (months > 12)).any(axis=1))
+    if bad.size:
+        line = np.flatnonzero(per_line)[bad[0]]
+        raise ValueError(
+            f"Line {first_line + line}: months must be between 1 and 12."
+        )
+    return pairs
+
+
+def days_between_many(pairs):
+    """
+    Number of days between the two dates of every row of parse_pairs().
+    """
+    first = day_ordinals(pairs[:, 0], pairs[:, 1], pairs[:, 2])
+    second = day_ordinals(pairs[:, 3], pairs[:, 4], pairs[:, 5])
+    return np.abs(second - first)
+
+
+def iter_bulk_days(lines, chunk_lines=100000, workers=1):
+    """
+    Stream results for an iterable of input lines, chunk by chunk.
+
+    Parameters:
+        lines (iterable): Lines such as "(2020,1,1),(2021,3,1)", with or
+            without a trailing newline.
+        chunk_lines (int): Number of lines parsed at a time.
+        workers (int): Number of processes; chunks keep their order and
+            at most 2 * workers chunks are read ahead of the output.
+
+    Yields:
+        str: Results of one chunk, one number per line.
+    """
+    chunks = _iter_text_chunks(lines, chunk_lines)
+    first_lines = count(1, chunk_lines)
+
+    if workers <= 1:
+        yield from map(_bulk_chunk, chunks, first_lines)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for text, first_line in zip(chunks, first_lines):
+            pending.append(pool.submit(_bulk_chunk, text, first_line))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _iter_text_chunks(lines, chunk_lines):
+    """
+    Join every chunk_lines lines into one newline-separated text.
+    """
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_lines))
+        if not chunk:
+            return
+        yield "\n".join(line.rstrip("\n") for line in chunk)
+
+
+def _bulk_chunk(text, first_line=1):
+    """
+    Compute and format the results for one chunk of input text.
+    """
+    days = days_between_many(parse_pairs(text, first_line))
+    return "".join(f"{n}\n" for n in days.tolist())
 
 
 # ------------------------------------------------
-# Output result
+# Script entry point
 # ------------------------------------------------
-print("The total number of days:", days)
+def main(argv=None):
+    """
+    Without arguments, read one line from stdin and print the result.
+    With --bulk, read one pair per line from a file (or stdin) and write
+    one number of days per line.
+    """
+    parser = argparse.ArgumentParser(
+        description="Count the days between two dates."
+    )
+    parser.add_argument("--bulk", action="store_true",
+                        help="process one date pair per line")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="bulk input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="bulk output file (default: stdout)")
+    parser.add_argument("-c", "--chunk-lines", type=int, default=100000,
+                        help="lines parsed at a time (default: 100000)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    if not args.bulk:
+        dates = parse_dates(input())
+        print("The total number of days:", days_between(*dates))
+        return
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    target = sys.stdout if args.output == "-" else \
+        open(args.output, "w", buffering=1 << 20)
+    try:
+        for text in iter_bulk_days(source, args.chunk_lines, args.workers):
+            target.write(text)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == "__main__":
+    main()
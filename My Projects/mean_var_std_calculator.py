@@ -1,10 +1,21 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 
 
-def calculate(list):
+def calculate(list, as_arrays=False):
     """
     Calculate mean, variance, standard deviation, max, min, and sum
-    for a 3x3 matrix created from a list of nine numbers.
+    for a matrix, or for every matrix in a batch.
+
+    The input may be:
+    - A list of exactly nine numbers, reshaped to a 3x3 matrix
+    - A 2-D array (any shape)
+    - A 3-D array holding a batch of equally shaped matrices
 
     The calculations are performed along:
     - Columns (axis=0)
@@ -12,109 +23,330 @@ def calculate(list):
     - The entire matrix
 
     Parameters:
-        list (list): A list containing exactly nine numerical values.
+        list (list or numpy.ndarray): The numbers to analyze.
+        as_arrays (bool): Return the NumPy arrays produced by the
+            reductions instead of converting them to Python lists.
 
     Returns:
-        dict: A dictionary containing statistical calculations.
+        dict: A dictionary containing statistical calculations. For a
+            batch, every entry holds one value per matrix.
     """
 
     # ------------------------------------------------
     # Convert input list into a NumPy array
     # ------------------------------------------------
-    arr3 = np.array(list)
-
-    # Ensure the list can be reshaped into a 3x3 matrix
-    try:
-        arr3 = arr3.reshape(3, 3)
-    except ValueError:
-        raise ValueError("List must contain nine numbers.")
+    arr3 = _as_matrix(list)
 
     # ------------------------------------------------
-    # Initialize containers for results
+    # Compute all statistics, then convert them to lists
     # ------------------------------------------------
-    mean = []
-    variance = []
-    standard_deviation = []
-    max = []
-    min = []
-    sum = []
+    statistics = _statistics(arr3)
+    if as_arrays:
+        return statistics
 
-    # ------------------------------------------------
-    # Mean calculations
-    # ------------------------------------------------
-    mean_columns = arr3.mean(axis=0)   # Column-wise mean
-    mean_rows = arr3.mean(axis=1)      # Row-wise mean
-    mean_all = arr3.mean()             # Overall mean
+    calculations = {}
+    for name, (columns, rows, overall) in statistics.items():
+        # The overall value of a single matrix stays a NumPy scalar
+        overall = overall.tolist() if arr3.ndim == 3 else overall[()]
+        calculations[name] = [columns.tolist(), rows.tolist(), overall]
 
-    mean.append(mean_columns.tolist())
-    mean.append(mean_rows.tolist())
-    mean.append(mean_all)
+    return calculations
 
-    # ------------------------------------------------
-    # Variance calculations
-    # ------------------------------------------------
-    var_columns = arr3.var(axis=0)
-    var_rows = arr3.var(axis=1)
-    var_all = arr3.var()
 
-    variance.append(var_columns.tolist())
-    variance.append(var_rows.tolist())
-    variance.append(var_all)
+def _as_matrix(values):
+    """
+    Convert the input into a 2-D matrix or a 3-D batch of matrices.
+    """
+    arr3 = np.asarray(values)
 
-    # ------------------------------------------------
-    # Standard deviation calculations
-    # ------------------------------------------------
-    std_columns = arr3.std(axis=0)
-    std_rows = arr3.std(axis=1)
-    std_all = arr3.std()
+    # A flat list must be reshaped into a 3x3 matrix
+    if arr3.ndim == 1:
+        try:
+            arr3 = arr3.reshape(3, 3)
+        except ValueError:
+            raise ValueError("List must contain nine numbers.")
 
-    standard_deviation.append(std_columns.tolist())
-    standard_deviation.append(std_rows.tolist())
-    standard_deviation.append(std_all)
+    if arr3.ndim not in (2, 3) or arr3.size == 0:
+        raise ValueError(
+            "Input must be a non-empty matrix or batch of matrices."
+        )
+
+    return arr3
 
-    # ------------------------------------------------
-    # Maximum value calculations
-    # ------------------------------------------------
-    max_columns = arr3.max(axis=0)
-    max_rows = arr3.max(axis=1)
-    max_all = arr3.max()
 
-    max.append(max_columns.tolist())
-    max.append(max_rows.tolist())
-    max.append(max_all)
+def _statistics(arr3):
+    """
+    Compute every statistic from a few shared reductions.
+
+    Sums give the means, squared deviations from those means give the
+    variances, and the standard deviations are square roots of the
+    variances; the overall max and min come from the column results.
+    Each step follows NumPy's own mean/var/std, so a single matrix gets
+    exactly the same values as before.
+
+    Returns:
+        dict: name -> [columns, rows, overall] arrays.
+    """
+    num_rows, num_cols = arr3.shape[-2:]
+    count = num_rows * num_cols
 
     # ------------------------------------------------
-    # Minimum value calculations
+    # Sums and means
     # ------------------------------------------------
-    min_columns = arr3.min(axis=0)
-    min_rows = arr3.min(axis=1)
-    min_all = arr3.min()
+    sum_columns = arr3.sum(axis=-2)
+    sum_rows = arr3.sum(axis=-1)
+    sum_all = arr3.sum(axis=(-2, -1))
 
-    min.append(min_columns.tolist())
-    min.append(min_rows.tolist())
-    min.append(min_all)
+    mean_columns = sum_columns / num_rows
+    mean_rows = sum_rows / num_cols
+    mean_all = sum_all / count
 
     # ------------------------------------------------
-    # Sum calculations
+    # Variances from squared deviations
     # ------------------------------------------------
-    sum_columns = arr3.sum(axis=0)
-    sum_rows = arr3.sum(axis=1)
-    sum_all = arr3.sum()
+    m2_columns = ((arr3 - mean_columns[..., None, :]) ** 2).sum(axis=-2)
+    m2_rows = ((arr3 - mean_rows[..., :, None]) ** 2).sum(axis=-1)
 
-    sum.append(sum_columns.tolist())
-    sum.append(sum_rows.tolist())
-    sum.append(sum_all)
+    m2_all = ((arr3 - mean_all[..., None, None]) ** 2).sum(axis=(-2, -1))
+
+    var_columns = m2_columns / num_rows
+    var_rows = m2_rows / num_cols
+    var_all = m2_all / count
 
     # ------------------------------------------------
-    # Combine all calculations into a dictionary
+    # Maximum and minimum
     # ------------------------------------------------
-    calculations = {
-        "mean": mean,
-        "variance": variance,
-        "standard deviation": standard_deviation,
-        "max": max,
-        "min": min,
-        "sum": sum,
+    max_columns = arr3.max(axis=-2)
+    max_rows = arr3.max(axis=-1)
+    min_columns = arr3.min(axis=-2)
+    min_rows = arr3.min(axis=-1)
+
+    return {
+        "mean": [mean_columns, mean_rows, mean_all],
+        "variance": [var_columns, var_rows, var_all],
+        "standard deviation": [
+            np.sqrt(var_columns), np.sqrt(var_rows), np.sqrt(var_all)
+        ],
+        "max": [max_columns, max_rows, max_columns.max(axis=-1)],
+        "min": [min_columns, min_rows, min_columns.min(axis=-1)],
+        "sum": [sum_columns, sum_rows, sum_all],
     }
 
-    return calculations
+
+# ------------------------------------------------
+# Out-of-core statistics for .npy files
+# ------------------------------------------------
+def calculate_file(path, chunk_rows=100000, workers=1, as_arrays=False):
+    """
+    calculate() for a 2-D matrix stored in a .npy file, without loading
+    it into memory.
+
+    The file is memory-mapped and processed in chunks of rows. Each chunk
+    yields mergeable partial results: count, mean, M2 (sum of squared
+    deviations), min, max and sum per column and for the whole chunk,
+    plus the complete statistics of its rows. The partials are merged in
+    order, so the result matches calculate() on the loaded matrix up to
+    floating point rounding.
+
+    Parameters:
+        path (str): Path to a .npy file holding a 2-D array.
+        chunk_rows (int): Number of rows read per chunk.
+        workers (int): Number of processes working on chunks.
+        as_arrays (bool): Return NumPy arrays, as in calculate().
+
+    Returns:
+        dict: The same dictionary calculate() returns.
+    """
+    matrix = np.load(path, mmap_mode="r")
+    if matrix.ndim != 2 or matrix.size == 0:
+        raise ValueError("File must contain a non-empty 2-D array.")
+
+    tasks = [(path, start, min(start + chunk_rows, len(matrix)))
+             for start in range(0, len(matrix), chunk_rows)]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            merged = _merge_partials(pool.map(_chunk_partial, tasks))
+    else:
+        merged = _merge_partials(map(_chunk_partial, tasks))
+
+    return _partial_result(merged, as_arrays)
+
+
+def _chunk_partial(task):
+    """
+    Compute the mergeable partial results for one chunk of rows.
+    """
+    path, start, stop = task
+    chunk = np.asarray(np.load(path, mmap_mode="r")[start:stop])
+    statistics = _statistics(chunk)
+    num_rows, num_cols = chunk.shape
+
+    mean_columns, mean_rows, mean_all = statistics["mean"]
+    var_columns, var_rows, var_all = statistics["variance"]
+    max_columns, max_rows, max_all = statistics["max"]
+    min_columns, min_rows, min_all = statistics["min"]
+    sum_columns, sum_rows, sum_all = statistics["sum"]
+
+    return {
+        # Column axis: merged across chunks
+        "columns": (num_rows, mean_columns, var_columns * num_rows,
+                    min_columns, max_columns, sum_columns),
+        # Whole matrix: merged across chunks
+        "all": (chunk.size, mean_all, var_all * chunk.size,
+                min_all, max_all, sum_all),
+        # Row axis: every row lies in one chunk, so these are final
+        "rows": [mean_rows, var_rows, max_rows, min_rows, sum_rows],
+    }
+
+
+def _merge_moments(a, b):
+    """
+    Merge two (count, mean, M2, min, max, sum) partials (Chan et al.).
+    """
+    count_a, mean_a, m2_a, min_a, max_a, sum_a = a
+    count_b, mean_b, m2_b, min_b, max_b, sum_b = b
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    return (
+        count,
+        mean_a + delta * (count_b / count),
+        m2_a + m2_b + delta ** 2 * (count_a * count_b / count),
+        np.minimum(min_a, min_b),
+        np.maximum(max_a, max_b),
+        sum_a + sum_b,
+    )
+
+
+def _merge_partials(partials):
+    """
+    Merge the partial results of consecutive chunks, in order.
+
+    Column and overall moments are merged as each chunk arrives; the
+    per-row statistics are collected and concatenated once at the end.
+    """
+    columns = overall = None
+    rows = [[], [], [], [], []]
+    for partial in partials:
+        if columns is None:
+            columns, overall = partial["columns"], partial["all"]
+        else:
+            columns = _merge_moments(columns, partial["columns"])
+            overall = _merge_moments(overall, partial["all"])
+        for parts, values in zip(rows, partial["rows"]):
+            parts.append(values)
+
+    return {
+        "columns": columns,
+        "all": overall,
+        "rows": [np.concatenate(parts) for parts in rows],
+    }
+
+
+def _partial_result(partial, as_arrays=False):
+    """
+    Turn merged partial results into calculate()'s dictionary.
+    """
+    count_c, mean_c, m2_c, min_c, max_c, sum_c = partial["columns"]
+    count_a, mean_a, m2_a, min_a, max_a, sum_a = partial["all"]
+    mean_r, var_r, max_r, min_r, sum_r = partial["rows"]
+
+    var_c = m2_c / count_c
+    var_a = m2_a / count_a
+    statistics = {
+        "mean": [mean_c, mean_r, mean_a],
+        "variance": [var_c, var_r, var_a],
+        "standard deviation": [np.sqrt(var_c), np.sqrt(var_r),
+                               np.sqrt(var_a)],
+        "max": [max_c, max_r, max_a],
+        "min": [min_c, min_r, min_a],
+        "sum": [sum_c, sum_r, sum_a],
+    }
+    if as_arrays:
+        return statistics
+
+    return {
+        name: [columns.tolist(), rows.tolist(), overall]
+        for name, (columns, rows, overall) in statistics.items()
+    }
+
+
+def benchmark_calculate_file(sizes_gb=(1.0, 10.0, 20.0), num_cols=100,
+                             workers=None, chunk_rows=100000,
+                             directory=None):
+    """
+    Compare calculate_file() with in-memory calculate() on random
+    float64 matrices of the given sizes (in GB) written to temporary
+    .npy files in directory (default: the system temporary directory).
+
+    The in-memory run is skipped when calculate()'s temporaries (about
+    three times the data) would not fit in the available memory, since
+    the OOM killer would end the process before a MemoryError is raised.
+    Sizes that do not fit on disk are skipped entirely.
+    """
+    workers = workers or os.cpu_count() or 1
+    directory = directory or tempfile.gettempdir()
+    print(f"{'size GB':>8}  {'in-memory s':>11}  {'file s':>8}  "
+          f"{'file x' + str(workers) + ' s':>10}")
+
+    for size_gb in sizes_gb:
+        num_rows = int(size_gb * 1e9 / 8 / num_cols)
+        size = num_rows * num_cols * 8
+        if size > shutil.disk_usage(directory).free:
+            print(f"{size_gb:>8.2f}  skipped: not enough disk space")
+            continue
+
+        with tempfile.TemporaryDirectory(dir=directory) as workdir:
+            path = os.path.join(workdir, "matrix.npy")
+            matrix = np.lib.format.open_memmap(
+                path, mode="w+", dtype=np.float64, shape=(num_rows, num_cols)
+            )
+            rng = np.random.default_rng(0)
+            for start in range(0, num_rows, chunk_rows):
+                stop = min(start + chunk_rows, num_rows)
+                matrix[start:stop] = rng.random((stop - start, num_cols))
+            matrix.flush()
+            del matrix
+
+            available = _available_memory()
+            if available is not None and 3 * size > available:
+                in_memory = f"{'too big':>11}"
+            else:
+                start = time.perf_counter()
+                calculate(np.load(path))
+                in_memory = f"{time.perf_counter() - start:11.2f}"
+
+            start = time.perf_counter()
+            calculate_file(path, chunk_rows)
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            calculate_file(path, chunk_rows, workers)
+            parallel = time.perf_counter() - start
+
+        print(f"{size_gb:>8.2f}  {in_memory}  {single:8.2f}  {parallel:10.2f}")
+
+
+def _available_memory():
+    """
+    Return the available physical memory in bytes (None if unknown).
+
+    Uses MemAvailable from /proc/meminfo, which counts reclaimable page
+    cache, and falls back to the free pages reported by sysconf.
+    """
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+if __name__ == "__main__":
+    benchmark_calculate_file()
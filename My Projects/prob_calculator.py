@@ -1,12 +1,21 @@
 import random
 import copy
+import math
+import os
+import time
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 
 
 class Hat:
     """
     A Hat object that contains colored balls.
-    Balls are stored as strings inside a list.
-    Example: Hat(red=2, blue=1) -> ['red', 'red', 'blue']
+    Balls are stored as a count per color, so draws and copies cost
+    O(number of colors) no matter how many balls the hat holds.
+    Example: Hat(red=2, blue=1) -> contents ['red', 'red', 'blue']
     """
 
     def __init__(self, **kwargs):
@@ -14,12 +23,46 @@ class Hat:
         Initialize the hat with colored balls.
         Each keyword represents a color and its quantity.
         """
-        self.contents = []
+        self.colors = [color for color, quantity in kwargs.items()
+                       if quantity > 0]
+        self.counts = np.array([kwargs[color] for color in self.colors],
+                               dtype=np.int64)
+
+    @property
+    def contents(self):
+        """
+        List view of the balls, one string per ball (e.g. ['red', 'red']).
+        """
+        contents = []
+        for color, quantity in zip(self.colors, self.counts.tolist()):
+            contents.extend([color] * quantity)
+        return contents
+
+    @contents.setter
+    def contents(self, balls):
+        counts = {}
+        for ball in balls:
+            counts[ball] = counts.get(ball, 0) + 1
+        self.colors = list(counts)
+        self.counts = np.array(list(counts.values()), dtype=np.int64)
+
+    def __len__(self):
+        """
+        Return the number of balls left in the hat.
+        """
+        return int(self.counts.sum())
+
+    def __copy__(self):
+        """
+        Copy the hat by copying its count array; colors are shared.
+        """
+        hat_copy = Hat.__new__(Hat)
+        hat_copy.colors = self.colors
+        hat_copy.counts = self.counts.copy()
+        return hat_copy
 
-        # Add each color into the contents list based on its quantity
-        for color, quantity in kwargs.items():
-            for _ in range(quantity):
-                self.contents.append(color)
+    def __deepcopy__(self, memo):
+        return self.__copy__()
 
     def draw(self, num_of_ball):
         """
@@ -32,22 +75,32 @@ class Hat:
         list: The balls that were drawn.
         """
         removed_balls = []
+        counts = self.counts.tolist()
+        total = sum(counts)
 
         # If requested more balls than available,
         # return all remaining balls.
-        if num_of_ball > len(self.contents):
-            return self.contents.copy()
+        if num_of_ball > total:
+            return self.contents
 
-        # Randomly remove balls one by one
+        # Pick each ball by its position among the remaining balls
         for _ in range(num_of_ball):
-            choice = random.choice(self.contents)
-            self.contents.remove(choice)
-            removed_balls.append(choice)
+            pick = random.randrange(total)
+            for i, quantity in enumerate(counts):
+                if pick < quantity:
+                    break
+                pick -= quantity
+            counts[i] -= 1
+            total -= 1
+            removed_balls.append(self.colors[i])
 
+        self.counts[:] = counts
         return removed_balls
 
 
-def experiment(hat, expected_balls, num_balls_drawn, num_experiments):
+def experiment(hat, expected_balls, num_balls_drawn, num_experiments,
+               engine="python", batch_size=10000, method="simulate",
+               workers=None, seed=None):
     """
     Perform a Monte Carlo simulation to estimate probability.
 
@@ -56,11 +109,49 @@ def experiment(hat, expected_balls, num_balls_drawn, num_experiments):
     expected_balls (dict): Expected ball counts (e.g., {"red": 2}).
     num_balls_drawn (int): Number of balls drawn per experiment.
     num_experiments (int): Number of simulation trials.
+    engine (str): "python" runs one trial at a time, "numpy" runs
+        trials in vectorized batches.
+    batch_size (int): Trials per batch for the "numpy" engine.
+    method (str): "simulate" runs the Monte Carlo trials, "exact"
+        computes the probability in closed form (see probability()).
+    workers (int, optional): Split the trials across this many processes.
+    seed (int, optional): Seed for a reproducible run. With a fixed seed
+        and number of workers the result is identical from run to run.
 
     Returns:
     float: Estimated probability of drawing at least the expected balls.
     """
+    if method == "exact":
+        return probability(hat, expected_balls, num_balls_drawn,
+                           num_experiments=num_experiments, engine=engine)
+    if method != "simulate":
+        raise ValueError("method must be 'simulate' or 'exact'.")
+    if engine not in ("python", "numpy"):
+        raise ValueError("engine must be 'python' or 'numpy'.")
+
+    if workers is not None or seed is not None:
+        success_count = _parallel_success_count(
+            hat, expected_balls, num_balls_drawn, num_experiments,
+            engine, batch_size, workers or 1, seed
+        )
+    elif engine == "numpy":
+        success_count = _numpy_success_count(
+            hat, expected_balls, num_balls_drawn, num_experiments, batch_size
+        )
+    else:
+        success_count = _python_success_count(
+            hat, expected_balls, num_balls_drawn, num_experiments
+        )
 
+    # Probability = successful experiments / total experiments
+    return success_count / num_experiments
+
+
+def _python_success_count(hat, expected_balls, num_balls_drawn,
+                          num_experiments):
+    """
+    Count successful trials, running them one at a time.
+    """
     success_count = 0  # Track successful experiments
 
     # Repeat experiment multiple times
@@ -88,5 +179,387 @@ def experiment(hat, expected_balls, num_balls_drawn, num_experiments):
         if success:
             success_count += 1
 
-    # Probability = successful experiments / total experiments
-    return success_count / num_experiments
+    return success_count
+
+
+def adaptive_experiment(hat, expected_balls, num_balls_drawn,
+                        tolerance=0.01, confidence=0.95, batch_size=10000,
+                        max_experiments=100000000, engine="numpy",
+                        seed=None):
+    """
+    Run trials in batches until the estimate is precise enough.
+
+    After each batch a Wilson score interval is computed for the running
+    estimate. The simulation stops once the interval is narrower than
+    tolerance, or once max_experiments trials have been run.
+
+    Parameters:
+    hat (Hat): A Hat object containing balls.
+    expected_balls (dict): Expected ball counts (e.g., {"red": 2}).
+    num_balls_drawn (int): Number of balls drawn per experiment.
+    tolerance (float): Largest accepted width of the confidence interval.
+    confidence (float): Confidence level of the interval (e.g. 0.95).
+    batch_size (int): Trials run between two interval checks.
+    max_experiments (int): Upper limit on the number of trials.
+    engine (str): "python" or "numpy" (see experiment()).
+    seed (int, optional): Seed for a reproducible run.
+
+    Returns:
+    dict: "probability" (estimate), "interval" (low, high) and
+        "num_experiments" (number of trials used).
+    """
+    if engine not in ("python", "numpy"):
+        raise ValueError("engine must be 'python' or 'numpy'.")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1.")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    if max_experiments < 1:
+        raise ValueError("max_experiments must be at least 1.")
+
+    if seed is None:
+        seed = _default_seed()
+    stream = np.random.SeedSequence(seed)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    success_count = 0
+    done = 0
+    while True:
+        size = min(batch_size, max_experiments - done)
+        success_count += _worker_success_count(
+            hat, expected_balls, num_balls_drawn, size, engine, batch_size,
+            stream.spawn(1)[0]
+        )
+        done += size
+
+        low, high = _wilson_interval(success_count, done, z)
+        if high - low < tolerance or done >= max_experiments:
+            break
+
+    return {
+        "probability": success_count / done,
+        "interval": (low, high),
+        "num_experiments": done,
+    }
+
+
+def _wilson_interval(successes, trials, z):
+    """
+    Wilson score interval for a binomial proportion.
+    """
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    centre = (p + z ** 2 / (2 * trials)) / denominator
+    margin = z * math.sqrt(
+        p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)
+    ) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def _default_seed(bits=128):
+    """
+    Return a seed drawn from the random module, so random.seed() keeps
+    runs repeatable.
+    """
+    return random.getrandbits(bits)
+
+
+# ------------------------------------------------
+# Vectorized NumPy engine
+# ------------------------------------------------
+def _hat_counts(hat):
+    """
+    Return the hat's colors and a matching array of ball counts.
+    """
+    return hat.colors, hat.counts.copy()
+
+
+def _required_counts(colors, expected_balls):
+    """
+    Map expected_balls onto the hat's color order.
+
+    Returns None if a color that is not in the hat is required,
+    since no draw can ever satisfy that condition.
+    """
+    index = {color: i for i, color in enumerate(colors)}
+    required = np.zeros(len(colors), dtype=np.int64)
+    for color, required_count in expected_balls.items():
+        if color in index:
+            required[index[color]] = required_count
+        elif required_count > 0:
+            return None
+    return required
+
+
+def _draw_counts(counts, num_balls_drawn, num_trials, rng):
+    """
+    Simulate num_trials independent draws without replacement.
+
+    Every trial starts from the same color counts and draws a whole
+    color-count vector at once, so the cost per trial depends on the
+    number of colors, not on the number of balls drawn.
+
+    Returns:
+    numpy.ndarray: (num_trials, num_colors) matrix of drawn counts.
+    """
+    total = int(counts.sum())
+
+    # Drawing more balls than available takes the whole hat
+    if num_balls_drawn >= total:
+        return np.tile(counts, (num_trials, 1))
+
+    return rng.multivariate_hypergeometric(counts, num_balls_drawn,
+                                           size=num_trials)
+
+
+def _numpy_success_count(hat, expected_balls, num_balls_drawn,
+                         num_experiments, batch_size, rng=None):
+    """
+    Count successful trials, simulating them in batches of batch_size.
+    """
+    colors, counts = _hat_counts(hat)
+    required = _required_counts(colors, expected_balls)
+    if required is None:
+        return 0
+
+    if rng is None:
+        rng = np.random.default_rng(_default_seed(64))
+
+    success_count = 0
+    done = 0
+    while done < num_experiments:
+        size = min(batch_size, num_experiments - done)
+        drawn = _draw_counts(counts, num_balls_drawn, size, rng)
+        success_count += int((drawn >= required).all(axis=1).sum())
+        done += size
+
+    return success_count
+
+
+def experiment_many(hat, conditions, num_balls_drawn, num_experiments,
+                    batch_size=10000, seed=None):
+    """
+    Estimate the probability of several conditions from one set of draws.
+
+    The draws are simulated once, in batches, as a (trials, colors)
+    count matrix, and every condition is checked against that matrix.
+    K conditions therefore cost about as much as a single experiment().
+
+    Parameters:
+    hat (Hat): A Hat object containing balls.
+    conditions (list): expected_balls dicts (e.g., [{"red": 2}, ...]).
+    num_balls_drawn (int): Number of balls drawn per experiment.
+    num_experiments (int): Number of simulation trials.
+    batch_size (int): Trials simulated at a time.
+    seed (int, optional): Seed for a reproducible run.
+
+    Returns:
+    list: Estimated probability for each condition, in order.
+    """
+    colors, counts = _hat_counts(hat)
+
+    # Conditions that need a color the hat lacks can never succeed
+    required = [_required_counts(colors, c) for c in conditions]
+    possible = [i for i, r in enumerate(required) if r is not None]
+    success_counts = [0] * len(conditions)
+    if not possible:
+        return [0.0] * len(conditions)
+    required = np.array([required[i] for i in possible])
+
+    if seed is None:
+        seed = _default_seed()
+    rng = np.random.default_rng(seed)
+
+    totals = np.zeros(len(possible), dtype=np.int64)
+    done = 0
+    while done < num_experiments:
+        size = min(batch_size, num_experiments - done)
+        drawn = _draw_counts(counts, num_balls_drawn, size, rng)
+        totals += (drawn[:, None, :] >= required).all(axis=2).sum(axis=0)
+        done += size
+
+    for i, total in zip(possible, totals.tolist()):
+        success_counts[i] = total
+    return [count / num_experiments for count in success_counts]
+
+
+# ------------------------------------------------
+# Multi-process execution
+# ------------------------------------------------
+def _parallel_success_count(hat, expected_balls, num_balls_drawn,
+                            num_experiments, engine, batch_size, workers,
+                            seed):
+    """
+    Split the trials across worker processes and add up their successes.
+
+    Each share gets its own random stream spawned from one SeedSequence,
+    so the streams are independent and the total only depends on the
+    seed and the number of workers.
+    """
+    if seed is None:
+        seed = _default_seed()
+
+    streams = np.random.SeedSequence(seed).spawn(workers)
+    shares = [num_experiments // workers + (i < num_experiments % workers)
+              for i in range(workers)]
+    tasks = [
+        (hat, expected_balls, num_balls_drawn, share, engine, batch_size,
+         stream)
+        for share, stream in zip(shares, streams)
+    ]
+
+    if workers == 1:
+        return _worker_success_count(*tasks[0])
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_worker_success_count, *zip(*tasks)))
+
+
+def _worker_success_count(hat, expected_balls, num_balls_drawn,
+                          num_experiments, engine, batch_size, stream):
+    """
+    Run one worker's share of the trials on its own random stream.
+    """
+    if engine == "numpy":
+        return _numpy_success_count(
+            hat, expected_balls, num_balls_drawn, num_experiments,
+            batch_size, rng=np.random.default_rng(stream)
+        )
+
+    # Hat.draw() uses the random module, so seed it for this share and
+    # restore the caller's state afterwards (matters when run in-process)
+    state = random.getstate()
+    random.seed(int(stream.generate_state(1, np.uint64)[0]))
+    try:
+        return _python_success_count(
+            hat, expected_balls, num_balls_drawn, num_experiments
+        )
+    finally:
+        random.setstate(state)
+
+
+def benchmark_workers(max_workers=None, num_experiments=2000000,
+                      engine="numpy"):
+    """
+    Print run time and speed-up of experiment() from 1 to max_workers.
+
+    Parameters:
+    max_workers (int, optional): Largest pool size (default: CPU count).
+    num_experiments (int): Number of trials per run.
+    engine (str): Simulation engine used by each worker.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    hat = Hat(black=6, red=4, green=3)
+    expected_balls = {"red": 2, "green": 1}
+
+    baseline = None
+    print(f"{'workers':>7}  {'seconds':>8}  {'speed-up':>8}  probability")
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        result = experiment(hat, expected_balls, 5, num_experiments,
+                            engine=engine, workers=workers, seed=0)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>7}  {elapsed:>8.3f}  {baseline / elapsed:>7.2f}x"
+              f"  {result:.6f}")
+
+
+# ------------------------------------------------
+# Exact multivariate hypergeometric probability
+# ------------------------------------------------
+def probability(hat, expected_balls, num_balls_drawn, max_terms=1000000,
+                num_experiments=100000, engine="numpy"):
+    """
+    Compute the probability of drawing at least the expected balls exactly.
+
+    Drawing from a Hat is sampling without replacement, so the result is a
+    sum of multivariate hypergeometric terms. Colors that are not required
+    are pooled into a single group, and the required colors are combined
+    one at a time, so the work grows with the number of required colors
+    rather than with the number of possible outcomes.
+
+    Results are memoized per hat composition, so repeated queries are
+    nearly free. If the sum would need more than max_terms terms, the
+    function falls back to simulation.
+
+    Parameters:
+    hat (Hat): A Hat object containing balls.
+    expected_balls (dict): Expected ball counts (e.g., {"red": 2}).
+    num_balls_drawn (int): Number of balls drawn.
+    max_terms (int): Largest number of terms to add up exactly.
+    num_experiments (int): Trials used if falling back to simulation.
+    engine (str): Simulation engine used for the fallback.
+
+    Returns:
+    float: Probability of drawing at least the expected balls.
+    """
+    colors, counts = _hat_counts(hat)
+    required = _required_counts(colors, expected_balls)
+    if required is None:
+        return 0.0
+
+    total = int(counts.sum())
+    num_balls_drawn = min(num_balls_drawn, total)
+    needed = required > 0
+
+    # (available, required) pairs in a canonical order for the cache
+    groups = tuple(sorted(zip(counts[needed].tolist(),
+                              required[needed].tolist())))
+    others = total - sum(n for n, _ in groups)
+
+    terms = sum(num_balls_drawn * (n - r + 1) for n, r in groups)
+    if terms > max_terms:
+        return experiment(hat, expected_balls, num_balls_drawn,
+                          num_experiments, engine=engine)
+
+    return _exact_probability(groups, others, num_balls_drawn)
+
+
+@lru_cache(maxsize=65536)
+def _comb(n, k):
+    """
+    Memoized binomial coefficient.
+
+    The cache is bounded: binomials of large hats are big integers, and a
+    long-running process may query many different hats.
+    """
+    return math.comb(n, k)
+
+
+@lru_cache(maxsize=1024)
+def _exact_probability(groups, others, num_balls_drawn):
+    """
+    Sum the hypergeometric terms for one hat composition.
+
+    Parameters:
+    groups (tuple): (available, required) pairs for each required color.
+    others (int): Number of balls of every other color.
+    num_balls_drawn (int): Number of balls drawn.
+
+    Returns:
+    float: Probability that every group meets its requirement.
+    """
+    # ways[s]: ways to draw s balls from the groups seen so far
+    # with every one of those groups meeting its requirement
+    ways = [1]
+    for available, needed in groups:
+        combined = [0] * min(len(ways) + available, num_balls_drawn + 1)
+        for s, w in enumerate(ways):
+            if not w:
+                continue
+            for x in range(needed, min(available, num_balls_drawn - s) + 1):
+                combined[s + x] += w * _comb(available, x)
+        ways = combined
+
+    # The rest of the draw comes from the pooled other colors
+    favourable = sum(
+        w * _comb(others, num_balls_drawn - s)
+        for s, w in enumerate(ways)
+        if w and num_balls_drawn - s <= others
+    )
+    total = others + sum(n for n, _ in groups)
+    return favourable / _comb(total, num_balls_drawn)
+
+
+if __name__ == "__main__":
+    benchmark_workers()
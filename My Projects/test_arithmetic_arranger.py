@@ -0,0 +1,51 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from arithmetic_arranger import (
+    arithmetic_arranger, arrange_pages, main, validate_problems
+)
+
+
+class ArrangePages(unittest.TestCase):
+    def test_non_ascii_digits_are_invalid(self):
+        errors = []
+        pages = list(arrange_pages(["² + 1", "3 + 4"], True, errors=errors))
+        self.assertEqual(pages, ["  3\n+ 4\n---\n  7"])
+        self.assertEqual(
+            errors, [(0, "² + 1", "Error: Numbers must only contain digits.")]
+        )
+        self.assertEqual(len(list(validate_problems(["١ + 2"]))), 1)
+
+    def test_arithmetic_arranger_ignores_extra_parts(self):
+        self.assertEqual(arithmetic_arranger(["3 + 4 + 5"]), "  3\n+ 4\n---")
+
+
+class CommandLine(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.input = os.path.join(directory.name, "problems.txt")
+        self.output = os.path.join(directory.name, "sheet.txt")
+        with open(self.input, "w") as file:
+            file.write("3 + 4\n\n5 * 2\n1 + 1\n")
+
+    def test_errors_report_input_line_numbers(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = main([self.input, "-o", self.output, "-q"])
+        self.assertEqual(status, 1)
+        self.assertIn("Line 3 ('5 * 2')", stderr.getvalue())
+
+    def test_sizes_below_one_are_rejected(self):
+        for option in ("-p", "-w", "-c"):
+            with contextlib.redirect_stderr(io.StringIO()), \
+                    self.assertRaises(SystemExit) as exit_info:
+                main([self.input, "-o", self.output, option, "0"])
+            self.assertEqual(exit_info.exception.code, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
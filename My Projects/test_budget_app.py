@@ -0,0 +1,127 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import date
+
+from budget_app import (
+    Category, LedgerStore, create_spend_chart, stress_test_transfers
+)
+
+
+class StressTestTransfers(unittest.TestCase):
+    def test_single_transfers_conserve_money(self):
+        stress_test_transfers(num_threads=4, transfers_per_thread=2000)
+
+    def test_batched_transfers_conserve_money(self):
+        stress_test_transfers(
+            num_threads=4, transfers_per_thread=2000, batch_size=100
+        )
+
+    def test_opposite_transfers_do_not_deadlock(self):
+        a, b = Category("a"), Category("b")
+        a.deposit(1000)
+        b.deposit(1000)
+
+        def worker(source, target):
+            for _ in range(5000):
+                source.transfer(1, target)
+
+        threads = [threading.Thread(target=worker, args=(a, b)),
+                   threading.Thread(target=worker, args=(b, a))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(a.get_balance() + b.get_balance(), 2000)
+
+
+class SpendChart(unittest.TestCase):
+    def test_window_without_spending_has_empty_bars(self):
+        food = Category("food")
+        food.deposit(100, timestamp=date(2025, 1, 1))
+        food.withdraw(10, timestamp=date(2025, 1, 2))
+
+        chart = create_spend_chart([food], start=date(2025, 3, 1))
+        self.assertIn("  0| o  ", chart)
+        self.assertIn(" 10|    ", chart)
+
+
+class StoredTransfers(unittest.TestCase):
+    def test_concurrent_transfers_survive_a_crash(self):
+        with tempfile.TemporaryDirectory() as path:
+            store = LedgerStore(path, snapshot_every=50)
+            categories = [store.category(f"c{i}") for i in range(4)]
+            for category in categories:
+                category.deposit(500)
+
+            def worker(offset):
+                for i in range(500):
+                    source = categories[(i + offset) % 4]
+                    target = categories[(i + offset + 1) % 4]
+                    source.transfer(3, target)
+
+            threads = [threading.Thread(target=worker, args=(offset,))
+                       for offset in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            balances = {c.name: c.get_balance() for c in categories}
+
+            store._log.close()  # Crash: no final snapshot
+            reopened = LedgerStore(path)
+            self.assertEqual(
+                {name: c.get_balance()
+                 for name, c in reopened.categories.items()},
+                balances,
+            )
+            self.assertEqual(sum(balances.values()), 2000)
+            reopened.close()
+
+    def test_torn_transfer_is_not_replayed(self):
+        with tempfile.TemporaryDirectory() as path:
+            store = LedgerStore(path)
+            store.category("a").deposit(100)
+            store.category("b")
+            store.close()
+
+            store = LedgerStore(path)
+            store.categories["a"].transfer(40, store.categories["b"])
+            store._log.close()
+            log_path = os.path.join(path, "transactions.log")
+            with open(log_path, "r+b") as log:
+                log.truncate(os.path.getsize(log_path) - 1)
+
+            reopened = LedgerStore(path)
+            self.assertEqual(reopened.categories["a"].get_balance(), 100)
+            self.assertEqual(reopened.categories["b"].get_balance(), 0)
+            reopened.close()
+
+    def test_records_after_a_lost_log_tail_are_kept(self):
+        with tempfile.TemporaryDirectory() as path:
+            log_path = os.path.join(path, "transactions.log")
+            store = LedgerStore(path)
+            store.category("a").deposit(100)
+            kept = os.path.getsize(log_path)
+            store.categories["a"].deposit(10)
+            store.snapshot()
+            store._log.close()
+
+            # An OS crash lost log records the snapshot covers
+            with open(log_path, "r+b") as log:
+                log.truncate(kept)
+
+            store = LedgerStore(path)
+            self.assertEqual(store.categories["a"].get_balance(), 110)
+            store.categories["a"].deposit(50)
+            store._log.close()
+
+            reopened = LedgerStore(path)
+            self.assertEqual(reopened.categories["a"].get_balance(), 160)
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+import numpy as np
+
+from days_counter import day_ordinals, iter_bulk_days, parse_pairs
+
+
+class BulkDays(unittest.TestCase):
+    def test_lines_without_newlines_are_kept_apart(self):
+        lines = ["(2020,1,1),(2020,1,5)", "(2020,1,1),(2021,1,1)"]
+        self.assertEqual("".join(iter_bulk_days(lines, chunk_lines=2)),
+                         "4\n366\n")
+
+    def test_invalid_months_are_rejected(self):
+        with self.assertRaises(ValueError):
+            day_ordinals(np.array([2020]), np.array([0]), np.array([1]))
+        with self.assertRaisesRegex(ValueError, "Line 3"):
+            parse_pairs("(1,1,1),(1,1,2)\n\n(2020,13,1),(2020,1,5)\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
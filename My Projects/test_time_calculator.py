@@ -0,0 +1,53 @@
+import unittest
+
+from time_calculator import add_time, add_time_many
+
+
+class AddTime(unittest.TestCase):
+    def test_examples(self):
+        self.assertEqual(add_time("3:00 PM", "3:10"), "6:10 PM")
+        self.assertEqual(add_time("11:43 PM", "24:20", "tueSday"),
+                         "12:03 AM, Thursday (2 days later)")
+        self.assertEqual(add_time("6:30 PM", "205:12"),
+                         "7:42 AM (9 days later)")
+
+    def test_other_meridiem_spellings_are_not_flipped(self):
+        # As in the original loop, only "AM" and "PM" change
+        self.assertEqual(add_time("3:00 pm", "25:00"), "4:00 pm")
+        self.assertEqual(add_time("3:00 am", "25:00", "Monday"),
+                         "4:00 am, Monday")
+
+    def test_negative_durations_flip_nothing(self):
+        self.assertEqual(add_time("3:00 PM", "-3:00"), "0:00 PM")
+        self.assertEqual(add_time("3:00 AM", "-5:00"), "-2:00 AM")
+
+
+class AddTimeMany(unittest.TestCase):
+    def check(self, starts, durations, days=None):
+        expected = [
+            add_time(start, duration,
+                     days[i] if isinstance(days, list) else days)
+            for i, (start, duration) in enumerate(zip(starts, durations))
+        ]
+        self.assertEqual(add_time_many(starts, durations, days), expected)
+
+    def test_matches_add_time(self):
+        self.check(["3:00 PM", "11:43 PM", "6:30 PM"],
+                   ["3:10", "24:20", "205:12"], "tueSday")
+
+    def test_meridiem_is_echoed(self):
+        self.check(["3:00 am", "3:00 pm", "3:00 Am"], ["25:00"] * 3)
+
+    def test_signs_and_huge_durations_use_add_time(self):
+        self.check(["3:00 PM", "3:00 AM", "3:00 PM"],
+                   ["-3:00", "-5:00", "99999999999999999999:00"])
+
+    def test_missing_weekdays(self):
+        days = ["Monday", None, float("nan"), ""]
+        results = add_time_many(["3:00 PM"] * 4, ["1:00"] * 4, days)
+        self.assertEqual(results,
+                         ["4:00 PM, Monday"] + ["4:00 PM"] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
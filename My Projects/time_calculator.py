@@ -1,3 +1,8 @@
+import time
+
+import numpy as np
+
+
 def add_time(start, duration, day=None):
     """
     Add a duration to a starting time in 12-hour AM/PM format.
@@ -44,7 +49,6 @@ def add_time(start, duration, day=None):
     # Add hours and minutes
     new_hour = st_hour + dr_hour
     new_min = st_min + dr_min
-    no_of_days = 0  # Tracks how many days have passed
 
     # ----------------------------
     # Handle minute overflow
@@ -65,24 +69,29 @@ def add_time(start, duration, day=None):
     # ----------------------------
     # Handle hour overflow (convert to 12-hour format)
     # ----------------------------
-    cycles = new_hour // 12
+    # Every 12 hours flips AM/PM, computed in closed form so any
+    # duration costs the same (a negative total flips nothing)
+    cycles = max(new_hour // 12, 0)
 
-    while cycles >= 1 and new_hour > 12:
+    if cycles >= 1 and new_hour > 12:
         new_hour = new_hour % 12
         if new_hour == 0:
             new_hour = 12
-            break
 
     # ----------------------------
     # Handle AM/PM transitions
     # ----------------------------
-    while cycles >= 1:
-        if cycles >= 1 and am_pm == "AM":
-            am_pm = "PM"
-        elif cycles >= 1 and am_pm == "PM":
-            am_pm = "AM"
-            no_of_days += 1  # A full day passes when PM → AM
-        cycles -= 1
+    # A full day passes on every PM → AM flip; other spellings (e.g.
+    # "pm") are never flipped, so no days pass for them
+    if am_pm == "AM":
+        no_of_days = cycles // 2
+    elif am_pm == "PM":
+        no_of_days = (cycles + 1) // 2
+    else:
+        no_of_days = 0
+
+    if am_pm in ("AM", "PM") and cycles % 2 == 1:
+        am_pm = "PM" if am_pm == "AM" else "AM"
 
     # ----------------------------
     # Handle optional weekday input
@@ -110,3 +119,207 @@ def add_time(start, duration, day=None):
             return f"{new_hour}:{new_min} {am_pm}"
         else:
             return f"{new_hour}:{new_min} {am_pm} ({no_of_days} days later)"
+
+
+# Weekday names indexed by day number modulo 7 (Sunday is 0 / 7)
+_WEEKDAYS = np.array(["Sunday", "Monday", "Tuesday", "Wednesday",
+                      "Thursday", "Friday", "Saturday"])
+_WEEKDAY_NUMBERS = {name: i or 7 for i, name in enumerate(_WEEKDAYS)}
+
+# Lookup tables for formatting hours ("12:") and minutes ("05")
+_HOURS = np.array([f"{h}:" for h in range(13)])
+_MINUTES = np.array([f"{m:02d}" for m in range(60)])
+
+
+# Longest number handled by the array path (larger ones go to add_time()
+# so the int64 arithmetic cannot overflow)
+_MAX_DIGITS = 15
+
+
+def _parse_ints(fields):
+    """
+    Parse an array of digit strings into int64 values.
+
+    The strings are viewed as a matrix of code points and the digits are
+    accumulated column by column, so no Python int is created per row.
+
+    Returns:
+        tuple: (values, valid), where valid marks the fields made of 1 to
+            _MAX_DIGITS ASCII digits; other fields get the value 0.
+    """
+    fields = np.ascontiguousarray(fields)
+    width = fields.dtype.itemsize // 4
+    codes = fields.view(np.uint32).reshape(len(fields), width)
+
+    values = np.zeros(len(fields), dtype=np.int64)
+    num_digits = np.zeros(len(fields), dtype=np.int64)
+    valid = np.ones(len(fields), dtype=bool)
+    for column in codes.T[:_MAX_DIGITS + 1]:
+        digit = column.astype(np.int64) - ord("0")
+        is_digit = (digit >= 0) & (digit <= 9)
+        valid &= is_digit | (column == 0)  # 0: padding after the string
+        num_digits += is_digit
+        values = np.where(is_digit, values * 10 + digit, values)
+
+    valid &= (num_digits >= 1) & (num_digits <= _MAX_DIGITS)
+    if width > _MAX_DIGITS + 1:
+        valid &= (codes[:, _MAX_DIGITS + 1:] == 0).all(axis=1)
+    return np.where(valid, values, 0), valid
+
+
+# How None, NaN and pandas' NA and NaT look after conversion to str
+_MISSING_LABELS = ["None", "nan", "<NA>", "NaT"]
+
+
+def _is_missing(value):
+    """
+    True for None, NaN and pandas' missing-value markers (NA, NaT).
+    """
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except TypeError:
+        return True  # pandas.NA cannot be converted to bool
+
+
+def add_time_many(starts, durations, days=None):
+    """
+    Vectorized add_time() over whole columns of inputs.
+
+    The inputs are parsed into integer arrays in one step, the time
+    arithmetic runs on the arrays and the results are formatted in bulk.
+    Rows the array path does not cover (signs, numbers longer than
+    _MAX_DIGITS digits, unusual spacing) are passed to add_time(), so
+    every result is identical to calling add_time() row by row.
+
+    Parameters:
+        starts (sequence): Start times in format "H:MM AM/PM"
+            (list, NumPy array or pandas Series).
+        durations (sequence): Durations in format "H:MM".
+        days (str or sequence, optional): Starting weekday for all rows,
+            or one per row (None, NaN or "" for rows without a weekday).
+
+    Returns:
+        list: New times, formatted exactly like add_time().
+    """
+
+    # ----------------------------
+    # Parse start times and durations into integer arrays
+    # ----------------------------
+    starts = np.asarray(starts, dtype=str)
+    durations = np.asarray(durations, dtype=str)
+    if starts.size == 0:
+        return []
+
+    st_hour, _, rest = np.char.partition(starts, ":").T
+    st_min, _, am_pm = np.char.partition(np.char.strip(rest), " ").T
+    dr_hour, _, dr_min = np.char.partition(durations, ":").T
+    am_pm = np.char.strip(am_pm)
+
+    st_hour, valid = _parse_ints(st_hour)
+    st_min, valid_st_min = _parse_ints(st_min)
+    dr_hour, valid_dr_hour = _parse_ints(dr_hour)
+    dr_min, valid_dr_min = _parse_ints(dr_min)
+    valid &= valid_st_min & valid_dr_hour & valid_dr_min
+    valid &= np.char.isalpha(am_pm)  # One word, as add_time() reads it
+
+    new_hour = st_hour + dr_hour
+    new_min = st_min + dr_min
+
+    # ----------------------------
+    # Time arithmetic (same rules as add_time)
+    # ----------------------------
+    new_hour += new_min // 60
+    new_min %= 60
+
+    cycles = new_hour // 12
+    wrap = (cycles >= 1) & (new_hour > 12)
+    wrapped = new_hour % 12
+    new_hour = np.where(wrap, np.where(wrapped == 0, 12, wrapped), new_hour)
+
+    # Only "AM" and "PM" flip; any other spelling is echoed unchanged
+    is_am = am_pm == "AM"
+    is_pm = am_pm == "PM"
+    no_of_days = np.where(is_am, cycles // 2,
+                          np.where(is_pm, (cycles + 1) // 2, 0))
+    flipped = (is_am | is_pm) & (cycles % 2 == 1)
+    am_pm = np.where(flipped, np.where(is_am, "PM", "AM"), am_pm)
+
+    # ----------------------------
+    # Format results in bulk
+    # ----------------------------
+    result = np.char.add(_HOURS[new_hour], _MINUTES[new_min])
+    result = np.char.add(np.char.add(result, " "), am_pm)
+
+    missing = None
+    if days is not None:
+        days = np.asarray(days, dtype=object)
+        single = days.ndim == 0
+        days = days.reshape(-1)
+        labels = days.astype(str)
+
+        # Missing values print as one of _MISSING_LABELS; only rows with
+        # such a label are checked one by one
+        missing = labels == ""
+        for i in np.flatnonzero(np.isin(labels, _MISSING_LABELS)).tolist():
+            missing[i] = _is_missing(days[i])
+        labels[missing] = ""
+
+        # A single weekday applies to every row
+        if single:
+            days, labels, missing = (
+                np.repeat(values, len(starts))
+                for values in (days, labels, missing)
+            )
+
+        # Capitalize and look up the (few) distinct weekday names once
+        unique, inverse = np.unique(labels, return_inverse=True)
+        unique = [name.capitalize() for name in unique.tolist()]
+        names = np.array(unique)[inverse]
+        has_day = np.array([bool(name) for name in unique])[inverse]
+        known = np.array(
+            [name in _WEEKDAY_NUMBERS for name in unique]
+        )[inverse]
+        valid &= known | ~has_day  # Unknown names raise in add_time()
+        start_num = np.array(
+            [_WEEKDAY_NUMBERS.get(name, 0) for name in unique],
+            dtype=np.int64
+        )[inverse]
+
+        new_day = _WEEKDAYS[(start_num + no_of_days) % 7]
+        day_part = np.char.add(", ", np.where(no_of_days == 0, names, new_day))
+        result = np.where(has_day, np.char.add(result, day_part), result)
+
+    # Day counts repeat a lot, so format each distinct count only once
+    unique, inverse = np.unique(no_of_days, return_inverse=True)
+    later = np.array([f" ({n} days later)" for n in unique.tolist()])[inverse]
+    suffix = np.where(no_of_days == 1, " (next day)",
+                      np.where(no_of_days == 0, "", later))
+    results = np.char.add(result, suffix).tolist()
+
+    # ----------------------------
+    # Rows outside the array path
+    # ----------------------------
+    for i in np.flatnonzero(~valid).tolist():
+        day = None if missing is None or missing[i] else str(days[i])
+        results[i] = add_time(str(starts[i]), str(durations[i]), day)
+    return results
+
+
+def benchmark_add_time(max_exponent=9, repeat=10000):
+    """
+    Print the average cost of add_time() for durations of 10^0 up to
+    10^max_exponent hours; it should stay flat.
+    """
+    for exponent in range(max_exponent + 1):
+        duration = f"{10 ** exponent}:45"
+        start = time.perf_counter()
+        for _ in range(repeat):
+            add_time("11:43 PM", duration, "tueSday")
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{duration:>14} hours  {elapsed * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    benchmark_add_time()